@@ -1,18 +1,35 @@
-from flask import Flask, render_template, request
+from flask import Flask, jsonify, render_template, request
+import math
 import os
-import pandas as pd
-import pickle
-import joblib
+import sys
+import threading
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, ".."))  # `python app/app.py` runs without the repo root on the path
+
+from src.serving.micro_batcher import MicroBatcher
+from src.serving.model_holder import ModelHolder
+from src.serving.prediction_cache import PredictionCache
+from src.utils.log_config import logger
 
 app = Flask(__name__)
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PREPROCESSOR_PATH = os.path.join(BASE_DIR, "..", "best_model", "transformed_object", "preprocessing.pkl")
 MODEL_PATH = os.path.join(BASE_DIR, "..", "best_model", "model.pkl")
 
-# Lazy load objects
-preprocessor = None
-model = None
+# Largest number of cars accepted by one /predict request
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", 1000))
+
+# Coalesce concurrent requests into one transform+predict call (MICRO_BATCH_MAX_SIZE
+# and MICRO_BATCH_MAX_LATENCY_MS tune it); "0" scores each request on its own
+MICRO_BATCHING = os.environ.get("MICRO_BATCHING", "1") == "1"
+# Encode requests with lookups compiled from preprocessing.pkl instead of pandas + sklearn
+FAST_PREPROCESSOR = os.environ.get("FAST_PREPROCESSOR", "1") == "1"
+# Reuse predictions for repeated inputs (PREDICTION_CACHE_* variables tune it)
+PREDICTION_CACHE = os.environ.get("PREDICTION_CACHE", "1") == "1"
+# How a new best_model/ version is picked up: "thread" swaps it in this process,
+# "master" leaves it to the gunicorn master (app/gunicorn.conf.py), "off" never reloads
+MODEL_RELOAD = os.environ.get("MODEL_RELOAD", "thread")
 
 FEATURE_COLUMNS = [
     "transmission",
@@ -24,22 +41,78 @@ FEATURE_COLUMNS = [
     "engine_hp",
     "vehicle_age"
 ]
+NUMERIC_COLUMNS = ["mileage", "engine_hp", "vehicle_age"]
+
+holder = ModelHolder(
+    MODEL_PATH, PREPROCESSOR_PATH, fast_preprocessor=FAST_PREPROCESSOR, release_on_reload=MODEL_RELOAD == "master"
+)
+batcher = None
+cache = None
+_batcher_lock = threading.Lock()
+_cache_lock = threading.Lock()
+
+def init_model():
+    """Load and warm up the model at startup (before gunicorn forks, with preload_app)."""
+    try:
+        holder.reload()
+    except Exception as e:
+        # Served lazily on the first request instead, e.g. before the first training run
+        logger.error(f"Model not loaded at startup: {e}")
+    if MODEL_RELOAD == "thread":
+        holder.watch()
+
+def get_cache():
+    global cache
+    if cache is None:
+        with _cache_lock:
+            if cache is None:
+                cache = PredictionCache(FEATURE_COLUMNS, NUMERIC_COLUMNS, holder.version)
+    return cache
+
+def score_uncached(records):
+    global batcher
+    if not MICRO_BATCHING:
+        return list(holder.predict(records))
+    if batcher is None:
+        with _batcher_lock:
+            if batcher is None:
+                batcher = MicroBatcher(holder.predict)
+    return batcher.predict(records)
+
+def predict_records(records):
+    if not PREDICTION_CACHE:
+        return score_uncached(records)
+
+    prediction_cache = get_cache()
+    version = holder.version
+    prediction_cache.set_version(version)
 
-def load_model_objects():
-    global preprocessor, model
-    if preprocessor is None:
-        with open(PREPROCESSOR_PATH, "rb") as f:
-            preprocessor = pickle.load(f)
-    if model is None:
-        model = joblib.load(MODEL_PATH)
+    # Predict on the canonical (bucketed) inputs so cached values are exact for their key
+    records = [prediction_cache.canonicalize(record) for record in records]
+    predictions = prediction_cache.get_many(records)
+    # Identical cars within one request are scored once
+    missing = {}
+    for i, pred in enumerate(predictions):
+        if pred is None:
+            missing.setdefault(tuple(records[i].values()), []).append(i)
+    if missing:
+        unique = [records[indices[0]] for indices in missing.values()]
+        scored = score_uncached(unique)
+        # Only cache results known to come from the version the cache is on
+        if holder.version == version:
+            prediction_cache.put_many(unique, scored)
+        for indices, pred in zip(missing.values(), scored):
+            for i in indices:
+                predictions[i] = pred
+    return predictions
+
+init_model()
 
 @app.route("/", methods=["GET", "POST"])
 def index():
     prediction = None
     if request.method == "POST":
         try:
-            load_model_objects()  # lazy load
-
             # Collect user input
             user_input = {
                 "transmission": request.form["transmission"],
@@ -52,11 +125,8 @@ def index():
                 "vehicle_age": float(request.form["vehicle_age"])
             }
 
-            input_df = pd.DataFrame([user_input], columns=FEATURE_COLUMNS)
-            input_transformed = preprocessor.transform(input_df)
-
             # Predict
-            pred = model.predict(input_transformed)[0]
+            pred = predict_records([user_input])[0]
             prediction = round(pred, 2)
 
         except Exception as e:
@@ -64,6 +134,77 @@ def index():
 
     return render_template("index.html", prediction=prediction)
 
+def is_finite_number(value) -> bool:
+    """True for JSON numbers that are finite as floats (not bools, NaN, inf or ints past float range)."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    try:
+        return math.isfinite(float(value))
+    except (OverflowError, TypeError):
+        return False
+
+def validate_cars(cars):
+    """Return a list of error messages for a /predict payload (empty when valid)."""
+    errors = []
+    for i, car in enumerate(cars):
+        if not isinstance(car, dict):
+            errors.append(f"cars[{i}]: expected an object")
+            continue
+        missing = [col for col in FEATURE_COLUMNS if car.get(col) is None]
+        if missing:
+            errors.append(f"cars[{i}]: missing {', '.join(missing)}")
+        unknown = sorted(set(car) - set(FEATURE_COLUMNS))
+        if unknown:
+            errors.append(f"cars[{i}]: unknown field(s) {', '.join(unknown)}")
+        for col in FEATURE_COLUMNS:
+            value = car.get(col)
+            if value is None:
+                continue
+            if col in NUMERIC_COLUMNS:
+                if not is_finite_number(value):
+                    errors.append(f"cars[{i}]: {col} must be a finite number")
+            elif not isinstance(value, str):
+                errors.append(f"cars[{i}]: {col} must be a string")
+    return errors
+
+@app.route("/predict", methods=["POST"])
+def predict():
+    """Price a batch of cars in one vectorized call.
+
+    Accepts ``{"cars": [{...}, ...]}`` (or a bare list) with every field of
+    FEATURE_COLUMNS per car, and returns ``{"predictions": [...]}`` in input order.
+    """
+    payload = request.get_json(silent=True)
+    cars = payload.get("cars") if isinstance(payload, dict) else payload
+    if not isinstance(cars, list) or not cars:
+        return jsonify(error='Expected a JSON body {"cars": [...]} with at least one car'), 400
+    if len(cars) > MAX_BATCH_SIZE:
+        return jsonify(error=f"At most {MAX_BATCH_SIZE} cars per request, got {len(cars)}"), 413
+    errors = validate_cars(cars)
+    if errors:
+        return jsonify(error="Invalid input", details=errors), 400
+
+    try:
+        preds = predict_records(cars)
+    except Exception as e:
+        return jsonify(error=str(e)), 500
+    return jsonify(predictions=[round(float(pred), 2) for pred in preds])
+
+@app.route("/health", methods=["GET"])
+def health():
+    """Served model version; 503 until a model is loaded."""
+    try:
+        return jsonify(status="ok", model_version=holder.version, reloads=holder.reloads, pid=os.getpid())
+    except Exception as e:
+        return jsonify(status="unavailable", error=str(e)), 503
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    """Hit/miss counters of this worker's prediction cache."""
+    if not PREDICTION_CACHE:
+        return jsonify(enabled=False)
+    return jsonify(enabled=True, **get_cache().stats())
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     app.run(host="0.0.0.0", port=port)
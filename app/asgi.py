@@ -0,0 +1,188 @@
+"""ASGI variant of the prediction app: ``uvicorn app.asgi:app``.
+
+Same routes and contracts as ``app/app.py`` (the HTML form on ``/``, JSON
+``/predict``, ``/health`` and ``/cache/stats``), and the same model holder,
+micro-batcher and prediction cache, imported from it. Connections are handled
+on an event loop, so slow clients cost no worker thread; transform+predict
+runs in a sized thread pool (NumPy/sklearn release the GIL for the heavy
+parts, and concurrent requests meet in the micro-batcher). Scale across cores
+with ``--workers``.
+
+When ``ASGI_MAX_PENDING`` predictions are already waiting for or running in
+the pool, new ones are rejected with 429 and ``Retry-After`` instead of
+queueing without bound. On shutdown (SIGTERM/SIGINT) uvicorn stops accepting
+connections and waits up to ``ASGI_GRACEFUL_TIMEOUT_SECONDS`` for open
+requests; the pool then finishes the predictions it holds, and anything
+arriving meanwhile gets 503.
+"""
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+from starlette.templating import Jinja2Templates
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# `python app/asgi.py` runs without the repo root on the path, and app/app.py would shadow the app package
+sys.path.insert(0, os.path.join(BASE_DIR, ".."))
+
+from app.app import MAX_BATCH_SIZE, PREDICTION_CACHE, get_cache, holder, predict_records, validate_cars
+from src.utils.log_config import logger
+
+# Threads running transform+predict (most of them wait on the micro-batcher)
+ASGI_PREDICT_THREADS = int(os.environ.get("ASGI_PREDICT_THREADS", 16))
+# Predictions allowed to wait for or run in the pool before answering 429
+ASGI_MAX_PENDING = int(os.environ.get("ASGI_MAX_PENDING", 256))
+# Seconds uvicorn waits for open requests on shutdown
+ASGI_GRACEFUL_TIMEOUT_SECONDS = int(os.environ.get("ASGI_GRACEFUL_TIMEOUT_SECONDS", 30))
+
+templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
+
+
+class Overloaded(Exception):
+    pass
+
+
+class PredictionPool:
+    """Bounded thread pool for ``predict_records``, awaited from the event loop."""
+
+    def __init__(self, threads: int = ASGI_PREDICT_THREADS, max_pending: int = ASGI_MAX_PENDING):
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self.accepting = True
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="predict")
+
+    async def predict(self, records: list) -> list:
+        # Only the event loop thread touches ``pending``, so no lock is needed
+        if not self.accepting:
+            raise RuntimeError("Server is shutting down")
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise Overloaded(f"{self.pending} predictions pending")
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, predict_records, records)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        self.accepting = False
+        self._executor.shutdown(wait=True)
+
+
+pool = PredictionPool()
+
+
+def overloaded_response(e: Exception) -> JSONResponse:
+    return JSONResponse({"error": f"Server busy, retry shortly ({e})"}, status_code=429, headers={"Retry-After": "1"})
+
+
+async def index(request):
+    prediction = None
+    status_code = 200
+    if request.method == "POST":
+        form = await request.form()
+        try:
+            # Collect user input
+            user_input = {
+                "transmission": form["transmission"],
+                "fuel_type": form["fuel_type"],
+                "drivetrain": form["drivetrain"],
+                "body_type": form["body_type"],
+                "make": form["make"],
+                "mileage": float(form["mileage"]),
+                "engine_hp": float(form["engine_hp"]),
+                "vehicle_age": float(form["vehicle_age"])
+            }
+
+            # Predict
+            pred = (await pool.predict([user_input]))[0]
+            prediction = round(pred, 2)
+
+        except Overloaded:
+            prediction = "Error: server busy, please try again"
+            status_code = 429
+        except Exception as e:
+            prediction = f"Error: {str(e)}"
+
+    return templates.TemplateResponse(request, "index.html", {"prediction": prediction}, status_code=status_code)
+
+
+async def predict(request):
+    """Price a batch of cars; same request and response bodies as ``app/app.py``."""
+    try:
+        payload = await request.json()
+    except Exception:
+        payload = None
+    cars = payload.get("cars") if isinstance(payload, dict) else payload
+    if not isinstance(cars, list) or not cars:
+        return JSONResponse({"error": 'Expected a JSON body {"cars": [...]} with at least one car'}, status_code=400)
+    if len(cars) > MAX_BATCH_SIZE:
+        return JSONResponse({"error": f"At most {MAX_BATCH_SIZE} cars per request, got {len(cars)}"}, status_code=413)
+    errors = validate_cars(cars)
+    if errors:
+        return JSONResponse({"error": "Invalid input", "details": errors}, status_code=400)
+
+    try:
+        preds = await pool.predict(cars)
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=503 if not pool.accepting else 500)
+    return JSONResponse({"predictions": [round(float(pred), 2) for pred in preds]})
+
+
+async def health(request):
+    """Served model version and pool load; 503 until a model is loaded or once shutting down."""
+    if not pool.accepting:
+        return JSONResponse({"status": "shutting down"}, status_code=503)
+    try:
+        return JSONResponse({
+            "status": "ok",
+            "model_version": holder.version,
+            "reloads": holder.reloads,
+            "pid": os.getpid(),
+            "pending": pool.pending,
+            "rejected": pool.rejected,
+        })
+    except Exception as e:
+        return JSONResponse({"status": "unavailable", "error": str(e)}, status_code=503)
+
+
+async def cache_stats(request):
+    """Hit/miss counters of this worker's prediction cache."""
+    if not PREDICTION_CACHE:
+        return JSONResponse({"enabled": False})
+    return JSONResponse({"enabled": True, **get_cache().stats()})
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    # uvicorn has drained the open connections; let the pool finish what it holds
+    logger.info(f"Shutting down prediction pool ({pool.pending} pending)")
+    pool.shutdown()
+
+
+app = Starlette(
+    routes=[
+        Route("/", index, methods=["GET", "POST"]),
+        Route("/predict", predict, methods=["POST"]),
+        Route("/health", health, methods=["GET"]),
+        Route("/cache/stats", cache_stats, methods=["GET"]),
+        Mount("/static", StaticFiles(directory=os.path.join(BASE_DIR, "static")), name="static"),
+    ],
+    lifespan=lifespan,
+)
+
+if __name__ == "__main__":
+    import uvicorn
+
+    port = int(os.environ.get("PORT", 5000))
+    uvicorn.run(app, host="0.0.0.0", port=port, timeout_graceful_shutdown=ASGI_GRACEFUL_TIMEOUT_SECONDS)
@@ -0,0 +1,43 @@
+"""gunicorn settings for the Flask app: ``gunicorn -c app/gunicorn.conf.py app.app:app``.
+
+The app (and with it the model) is imported once in the master before the
+workers fork, so every worker shares the loaded model copy-on-write instead of
+unpickling its own. A watcher thread in the master polls ``best_model/``; on a
+new version it sends the master SIGHUP, ``on_reload`` frees the master's copy
+of the old model (the old workers keep theirs), loads and warms the new one,
+and gunicorn forks fresh workers from it while the old workers finish their
+in-flight requests and exit. Until they have, the host holds the old model in
+the old workers plus the new one in the master and new workers.
+"""
+import gc
+import os
+import signal
+
+# Reloads are driven by the master, never by individual workers
+os.environ.setdefault("MODEL_RELOAD", "master")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+# Threaded workers give the micro-batcher concurrent requests to coalesce
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+preload_app = True
+graceful_timeout = 30
+
+
+def when_ready(server):
+    from app.app import holder
+    # Keep the garbage collector from touching (and so copying) the preloaded objects
+    gc.freeze()
+    holder.watch(on_change=lambda version: os.kill(server.pid, signal.SIGHUP))
+
+
+def on_reload(server):
+    from app.app import holder
+    try:
+        holder.reload()
+    except Exception as e:
+        server.log.error(f"Model reload failed, workers keep the current model: {e}")
+    finally:
+        # The reload thaws the frozen objects to collect the old model; freeze what the new workers inherit
+        gc.freeze()
@@ -3,15 +3,14 @@ import json
 import sys
 from dotenv import load_dotenv
 import pandas as pd 
-import pymongo
 import numpy as np
 from src.utils.log_config import logging
 from src.utils.exception import CustomException
+from src.utils.mongo_connection import get_mongo_client
 
 
 load_dotenv()
 
-MONGO_URL=os.getenv('MONGODB_URI')
 import certifi
 ca=certifi.where()
 
@@ -40,7 +39,7 @@ class DataExtract():
             self.database=database
             self.collection=collection
             self.records=records
-            self.mongo_client=pymongo.MongoClient(MONGO_URL)
+            self.mongo_client=get_mongo_client()
             self.database=self.mongo_client[self.database]
             self.collection=self.database[self.collection]
             self.collection.insert_many(self.records)
@@ -1,10 +1,6 @@
-import os
-from pymongo import MongoClient
-from dotenv import load_dotenv
-load_dotenv()
-mongo_db_url = os.getenv("MONGODB_URL")
+from src.utils.mongo_connection import MONGO_URL, get_mongo_client
 
-if not mongo_db_url:
+if not MONGO_URL:
     raise ValueError("MongoDB URL not found in environment variables!")
 
 _cached = {"conn": None}
@@ -15,7 +11,7 @@ def connect_to_dbs():
         return _cached["conn"]
 
     try:
-        client = MongoClient(mongo_db_url, serverSelectionTimeoutMS=5000)
+        client = get_mongo_client()
         client.admin.command('ping')
         print("Database connected")
         _cached["conn"] = client
@@ -1,19 +1,24 @@
 import os
 import sys
+from itertools import islice
 import numpy as np
 import pandas as pd
-from pymongo import MongoClient
+from bson import ObjectId
 from sklearn.model_selection import train_test_split
-from dotenv import load_dotenv
 
 from src.utils.exception import CustomException
 from src.utils.log_config import logger  # fixed import
 from src.entity.artifact_entity import DataIngestionArtifact
 from src.entity.config_entity import DataIngestionConfig
-
-load_dotenv()
-
-MONGO_URL = os.getenv('MONGODB_URL')
+from src.utils.main_utils import (
+    read_yaml_file,
+    write_yaml_file,
+    write_table,
+    list_previous_artifact_dirs,
+    TableWriter,
+)
+from src.utils.mongo_connection import get_collection
+from src.constant import ARTIFACT_TIMESTAMP_FORMAT
 
 
 class DataIngestion:
@@ -33,13 +38,15 @@ class DataIngestion:
                 "body_type",
                 "price",  # added missing comma in original list
             ]
+            self.categorical_columns = ["make", "transmission", "fuel_type", "drivetrain", "body_type"]
+            self.numeric_columns = ["mileage", "engine_hp", "vehicle_age", "price"]
+            self.last_watermark = None
         except Exception as e:
             raise CustomException(e, sys)
 
     def load_data_from_mongo(self) -> pd.DataFrame:
         try:
-            client = MongoClient(MONGO_URL)
-            collection = client[self.config.database_name][self.config.collection_name]
+            collection = get_collection(self.config.database_name, self.config.collection_name)
             df = pd.DataFrame(list(collection.find()))
             if "_id" in df.columns:
                 df.drop(columns=["_id"], inplace=True)
@@ -54,10 +61,173 @@ class DataIngestion:
             logger.error("Error loading data from MongoDB")
             raise CustomException(e, sys)
 
+    def _to_typed_frame(self, documents: list) -> pd.DataFrame:
+        df = pd.DataFrame.from_records(documents, columns=self.required_columns)
+        df.replace({"na": np.nan}, inplace=True)
+        for col in self.numeric_columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+        for col in self.categorical_columns:
+            df[col] = df[col].astype("category")
+        return df
+
+    def stream_data_from_mongo(self, query: dict = None):
+        """Yield typed DataFrame chunks of at most ``batch_size`` documents.
+
+        The projection is pushed to the server so ``_id`` and unused fields never
+        leave MongoDB, and only one batch is held in memory at a time. In
+        incremental mode the cursor is sorted on the watermark field and the
+        highest value seen is kept in ``self.last_watermark``.
+        """
+        try:
+            collection = get_collection(self.config.database_name, self.config.collection_name)
+            watermark_field = self.config.watermark_field if self.config.incremental else None
+            projection = {col: 1 for col in self.required_columns}
+            projection["_id"] = 0
+            if watermark_field:
+                projection[watermark_field] = 1
+            cursor = collection.find(query or {}, projection=projection, batch_size=self.config.batch_size)
+            if watermark_field:
+                cursor = cursor.sort(watermark_field, 1)
+
+            while True:
+                documents = list(islice(cursor, self.config.batch_size))
+                if not documents:
+                    break
+                if watermark_field:
+                    self.last_watermark = documents[-1].get(watermark_field, self.last_watermark)
+                yield self._to_typed_frame(documents)
+        except Exception as e:
+            logger.error("Error streaming data from MongoDB")
+            raise CustomException(e, sys)
+
+    def source_fingerprint(self) -> dict:
+        """Cheap summary of the source collection used to decide if a cached ingestion is current.
+
+        Counts come from collection metadata and the newest watermark from the
+        ``_id``/watermark index, so nothing is scanned; in-place edits of existing
+        documents are not detected.
+        """
+        try:
+            collection = get_collection(self.config.database_name, self.config.collection_name)
+            field = self.config.watermark_field
+            latest = collection.find_one({}, projection={field: 1}, sort=[(field, -1)])
+            return {
+                "database": self.config.database_name,
+                "collection": self.config.collection_name,
+                "documents": collection.estimated_document_count(),
+                "latest": str(latest.get(field)) if latest else None,
+            }
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _previous_run_path(self, path: str, previous_run_dir: str) -> str:
+        return os.path.join(previous_run_dir, os.path.relpath(path, self.config.artifact_dir))
+
+    def get_previous_ingestion(self):
+        """Return ``(run_dir, watermark)`` for the latest earlier run that can be extended."""
+        try:
+            for run_dir in list_previous_artifact_dirs(
+                self.config.artifact_root, self.config.artifact_dir, ARTIFACT_TIMESTAMP_FORMAT
+            ):
+                paths = [
+                    self.config.watermark_file_path,
+                    self.config.feature_store_file_path,
+                    self.config.training_file_path,
+                    self.config.testing_file_path,
+                ]
+                if not all(os.path.exists(self._previous_run_path(path, run_dir)) for path in paths):
+                    continue
+                watermark = read_yaml_file(self._previous_run_path(self.config.watermark_file_path, run_dir))
+                if watermark and watermark.get("field") == self.config.watermark_field and watermark.get("value") is not None:
+                    return run_dir, watermark
+            return None, None
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _watermark_query(self, watermark: dict) -> dict:
+        value = watermark["value"]
+        if self.config.watermark_field == "_id":
+            value = ObjectId(value)
+        return {self.config.watermark_field: {"$gt": value}}
+
+    def save_watermark(self, total_rows: int, delta_rows: int, previous_run_dir: str = None) -> None:
+        try:
+            value = self.last_watermark
+            content = {
+                "field": self.config.watermark_field,
+                "value": str(value) if isinstance(value, ObjectId) else value,
+                "total_rows": total_rows,
+                "delta_rows": delta_rows,
+                "previous_run": previous_run_dir,
+            }
+            if isinstance(value, ObjectId):
+                content["value_generated_at"] = value.generation_time.isoformat()
+            write_yaml_file(self.config.watermark_file_path, content)
+            logger.info(f"Saved ingestion watermark {content['value']} at {self.config.watermark_file_path}")
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def stream_and_save_data(self) -> int:
+        """Stream MongoDB into the feature store and train/test files chunk by chunk.
+
+        Rows are assigned to the test split with a seeded per-row draw, so the split
+        never needs the full dataset in memory. In incremental mode the previous
+        run's files are carried over and only documents past its watermark are
+        fetched and appended.
+        """
+        try:
+            self.last_watermark = None
+            query = None
+            previous_rows = 0
+            previous_run_dir, watermark = (None, None)
+            if self.config.incremental:
+                previous_run_dir, watermark = self.get_previous_ingestion()
+
+            writers = [
+                TableWriter(self.config.feature_store_file_path),
+                TableWriter(self.config.training_file_path),
+                TableWriter(self.config.testing_file_path),
+            ]
+            feature_store_writer, train_writer, test_writer = writers
+            delta_train_writer = TableWriter(self.config.delta_training_file_path) if self.config.incremental else None
+            if previous_run_dir:
+                for writer in writers:
+                    writer.write_file(self._previous_run_path(writer.file_path, previous_run_dir))
+                query = self._watermark_query(watermark)
+                self.last_watermark = query[self.config.watermark_field]["$gt"]
+                previous_rows = watermark.get("total_rows", 0)
+                logger.info(f"Incremental ingestion from {previous_run_dir} after watermark {watermark['value']}")
+
+            rng = np.random.default_rng(42)
+            delta_rows = 0
+            try:
+                for chunk in self.stream_data_from_mongo(query):
+                    test_mask = rng.random(len(chunk)) < self.config.train_test_split_ratio
+                    feature_store_writer.write(chunk)
+                    train_writer.write(chunk[~test_mask])
+                    test_writer.write(chunk[test_mask])
+                    if delta_train_writer is not None:
+                        delta_train_writer.write(chunk[~test_mask])
+                    delta_rows += len(chunk)
+                    logger.info(f"Ingested {delta_rows} new rows so far")
+            finally:
+                for writer in writers + [delta_train_writer]:
+                    if writer is not None:
+                        writer.close()
+
+            total_rows = previous_rows + delta_rows
+            if total_rows == 0:
+                raise CustomException("No data found. Cannot split empty dataset.", sys)
+            if self.config.incremental:
+                self.save_watermark(total_rows, delta_rows, previous_run_dir)
+            logger.info(f"Streamed {delta_rows} new rows ({total_rows} total) into {self.config.feature_store_file_path}")
+            return total_rows, delta_rows
+        except Exception as e:
+            raise CustomException(e, sys)
+
     def save_feature_store(self, df: pd.DataFrame) -> pd.DataFrame:
         try:
-            os.makedirs(os.path.dirname(self.config.feature_store_file_path), exist_ok=True)
-            df.to_csv(self.config.feature_store_file_path, index=False, header=True)
+            write_table(df, self.config.feature_store_file_path)
             logger.info(f"Saved feature store at {self.config.feature_store_file_path}")
             return df
         except Exception as e:
@@ -72,22 +242,30 @@ class DataIngestion:
             logger.info("Performed train-test split")
 
             # Save training and testing datasets
-            os.makedirs(os.path.dirname(self.config.training_file_path), exist_ok=True)
-            train_set.to_csv(self.config.training_file_path, index=False, header=True)
-            test_set.to_csv(self.config.testing_file_path, index=False, header=True)
+            write_table(train_set, self.config.training_file_path)
+            write_table(test_set, self.config.testing_file_path)
             logger.info("Saved training and testing datasets")
         except Exception as e:
             raise CustomException(e, sys)
 
     def run(self) -> DataIngestionArtifact:
         try:
-            df = self.load_data_from_mongo()
-            df = self.save_feature_store(df)
-            self.split_and_save_data(df)
+            delta_train_file_path = delta_rows = total_rows = None
+            if self.config.streaming:
+                total_rows, delta_rows = self.stream_and_save_data()
+                if self.config.incremental and delta_rows:
+                    delta_train_file_path = self.config.delta_training_file_path
+            else:
+                df = self.load_data_from_mongo()
+                df = self.save_feature_store(df)
+                self.split_and_save_data(df)
 
             artifact = DataIngestionArtifact(
                 trained_file_path=self.config.training_file_path,
-                test_file_path=self.config.testing_file_path
+                test_file_path=self.config.testing_file_path,
+                delta_train_file_path=delta_train_file_path,
+                delta_rows=delta_rows,
+                total_rows=total_rows
             )
             logger.info("Data Ingestion completed successfully")
             return artifact
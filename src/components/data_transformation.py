@@ -3,7 +3,7 @@ import sys
 import pickle
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, FunctionTransformer
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 
@@ -11,6 +11,7 @@ from src.entity.artifact_entity import DataTransformationArtifact, DataValidatio
 from src.entity.config_entity import DataTransformationConfig
 from src.utils.exception import CustomException
 from src.utils.log_config import logger
+from src.utils.main_utils import read_table, save_transformed_array, iter_table_chunks, count_table_rows, write_yaml_file
 
 
 class DataTransformation:
@@ -26,18 +27,44 @@ class DataTransformation:
         self.categorical_cols = ['transmission', 'fuel_type', 'drivetrain', 'body_type', 'make']
         self.numeric_cols = ['mileage', 'engine_hp', 'vehicle_age']
 
+    def load_features(self, file_path: str):
+        """Return ``(X, y)`` from a validated split, ready for the preprocessor."""
+        try:
+            # Load only the feature and target columns
+            target_column = "price"
+            df = read_table(file_path, columns=self.categorical_cols + self.numeric_cols + [target_column])
+            X = df.drop(columns=[target_column])
+
+            # Schema validation already quarantines rows with missing values; this only guards
+            # against schemas that mark a numeric column nullable
+            X[self.numeric_cols] = X[self.numeric_cols].fillna(0)
+            # Parquet splits already load categoricals as category; CSV ones come in as object
+            X[self.categorical_cols] = X[self.categorical_cols].astype("category")
+            return X, df[target_column]
+        except Exception as e:
+            raise CustomException(e, sys)
+
     def get_transformer_object(self):
         try:
             # Keep all categories, do NOT drop any
-            ohe = OneHotEncoder(sparse_output=False, handle_unknown='ignore')
+            sparse_output = self.data_transformation_config.sparse_output
+            feature_dtype = np.dtype(self.data_transformation_config.feature_dtype).type
+            ohe = OneHotEncoder(sparse_output=sparse_output, handle_unknown='ignore', dtype=feature_dtype)
             scaler = StandardScaler()
+            # StandardScaler preserves its input dtype, so casting first keeps the whole
+            # output in feature_dtype, at training time and in serving alike
+            numeric_pipeline = Pipeline([
+                ('cast', FunctionTransformer(np.asarray, kw_args={'dtype': feature_dtype}, feature_names_out='one-to-one')),
+                ('scaler', scaler)
+            ])
 
             preprocessor = ColumnTransformer(
                 transformers=[
                     ('ohe', ohe, self.categorical_cols),
-                    ('scaler', scaler, self.numeric_cols)
+                    ('scaler', numeric_pipeline, self.numeric_cols)
                 ],
-                remainder='drop'  # keep all other columns if any
+                remainder='drop',  # keep all other columns if any
+                sparse_threshold=1.0 if sparse_output else 0.0
             )
 
             logger.info('Initialized StandardScaler and OneHotEncoder (all categories kept).')
@@ -46,44 +73,11 @@ class DataTransformation:
             logger.error('Error creating transformer object.')
             raise CustomException(e, sys)
 
-    def initiate_data_transformation(self) -> DataTransformationArtifact:
+    def save_transformer_objects(self, preprocessing_obj) -> str:
+        """Pickle the fitted pipeline plus its fitted scaler and encoder; returns the scaler path."""
         try:
-            logger.info('Starting data transformation process.')
-
-            # Load validated train and test data
-            train_df = pd.read_csv(self.data_validation_artifact.valid_train_file_path)
-            test_df = pd.read_csv(self.data_validation_artifact.valid_test_file_path)
-            logger.info(f"Train shape before transformation: {train_df.shape}")
-            logger.info(f"Test shape before transformation: {test_df.shape}")
-
-            # Separate features and target
-            target_column = "price"
-            X_train = train_df.drop(columns=[target_column])
-            y_train = train_df[target_column]
-            X_test = test_df.drop(columns=[target_column])
-            y_test = test_df[target_column]
-
-            # Fill missing values
-            X_train.fillna(0, inplace=True)
-            X_test.fillna(0, inplace=True)
-
-            # Get transformer objects
-            preprocessing_obj, ohe_obj, scaler_obj = self.get_transformer_object()
-
-            # Transform features
-            X_train_transformed = preprocessing_obj.fit_transform(X_train)
-            X_test_transformed = preprocessing_obj.transform(X_test)
-            logger.info("Feature transformation completed.")
-
-            # Combine features with target
-            train_arr = np.c_[X_train_transformed, np.array(y_train)]
-            test_arr = np.c_[X_test_transformed, np.array(y_test)]
-
-            # Save transformed arrays
-            os.makedirs(os.path.dirname(self.data_transformation_config.transformed_train_file_path), exist_ok=True)
-            np.save(self.data_transformation_config.transformed_train_file_path, train_arr)
-            np.save(self.data_transformation_config.transformed_test_file_path, test_arr)
-            logger.info("Transformed train and test data saved as .npy files.")
+            ohe_obj = preprocessing_obj.named_transformers_['ohe']
+            scaler_obj = preprocessing_obj.named_transformers_['scaler'][-1]
 
             # Save preprocessing pipeline
             os.makedirs(os.path.dirname(self.data_transformation_config.transformed_object_file_path), exist_ok=True)
@@ -109,12 +103,168 @@ class DataTransformation:
                 pickle.dump(ohe_obj, f)
             logger.info("OneHotEncoder saved successfully.")
 
-            # Return artifact
+            # Record the output layout so consumers can check what they load
+            write_yaml_file(self.data_transformation_config.metadata_file_path, {
+                'feature_dtype': self.data_transformation_config.feature_dtype,
+                'sparse_output': self.data_transformation_config.sparse_output,
+                'feature_names': preprocessing_obj.get_feature_names_out().tolist(),
+            }, replace=True)
+            return scaler_path
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def fit_streaming_transformer(self, file_path: str):
+        """Fit the preprocessor in one chunked pass over ``file_path``.
+
+        The scaler is fitted with ``partial_fit`` and category vocabularies are
+        accumulated per chunk, so the training split is never fully loaded.
+        """
+        try:
+            scaler = StandardScaler()
+            vocabularies = {col: set() for col in self.categorical_cols}
+            first_chunk = None
+            for chunk in iter_table_chunks(
+                file_path, columns=self.categorical_cols + self.numeric_cols, chunk_size=self.data_transformation_config.chunk_size
+            ):
+                chunk[self.numeric_cols] = chunk[self.numeric_cols].fillna(0)
+                scaler.partial_fit(chunk[self.numeric_cols].to_numpy(dtype=self.data_transformation_config.feature_dtype))
+                for col in self.categorical_cols:
+                    vocabularies[col].update(chunk[col].dropna().unique())
+                if first_chunk is None:
+                    first_chunk = chunk
+
+            preprocessing_obj, ohe_obj, _ = self.get_transformer_object()
+            ohe_obj.set_params(categories=[sorted(vocabularies[col]) for col in self.categorical_cols])
+            # Fixed categories make fitting on one chunk sufficient for the encoder;
+            # the scaler then takes the statistics accumulated over every chunk
+            preprocessing_obj.fit(first_chunk)
+            # transformers_ holds the fitted clones that transform() uses
+            fitted_scaler = dict((name, step) for name, step, _ in preprocessing_obj.transformers_)['scaler'][-1]
+            for attr in ('mean_', 'var_', 'scale_', 'n_samples_seen_'):
+                setattr(fitted_scaler, attr, getattr(scaler, attr))
+            logger.info(f"Fitted streaming preprocessor on {int(scaler.n_samples_seen_)} rows.")
+            return preprocessing_obj
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def transform_to_memmap(self, preprocessing_obj, file_path: str, features_file_path: str, target_file_path: str) -> None:
+        """Transform ``file_path`` chunk by chunk into preallocated ``.npy`` memmaps."""
+        try:
+            target_column = "price"
+            n_rows = count_table_rows(file_path)
+            n_features = len(preprocessing_obj.get_feature_names_out())
+            os.makedirs(os.path.dirname(features_file_path), exist_ok=True)
+            features = np.lib.format.open_memmap(
+                features_file_path, mode='w+', dtype=self.data_transformation_config.feature_dtype, shape=(n_rows, n_features)
+            )
+            target = np.lib.format.open_memmap(target_file_path, mode='w+', dtype=np.float64, shape=(n_rows,))
+
+            start = 0
+            for chunk in iter_table_chunks(
+                file_path,
+                columns=self.categorical_cols + self.numeric_cols + [target_column],
+                chunk_size=self.data_transformation_config.chunk_size
+            ):
+                stop = start + len(chunk)
+                chunk[self.numeric_cols] = chunk[self.numeric_cols].fillna(0)
+                transformed = preprocessing_obj.transform(chunk.drop(columns=[target_column]))
+                features[start:stop] = transformed.toarray() if hasattr(transformed, "toarray") else transformed
+                target[start:stop] = chunk[target_column].to_numpy()
+                start = stop
+
+            features.flush()
+            target.flush()
+            del features, target
+            logger.info(f"Streamed {n_rows} rows x {n_features} features into {features_file_path}")
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def initiate_streaming_data_transformation(self) -> DataTransformationArtifact:
+        try:
+            logger.info('Starting streaming data transformation process.')
+            if self.data_transformation_config.sparse_output:
+                logger.warning('Streaming transformation writes dense memmaps; sparse_output is ignored.')
+
+            preprocessing_obj = self.fit_streaming_transformer(self.data_validation_artifact.valid_train_file_path)
+            self.transform_to_memmap(
+                preprocessing_obj,
+                self.data_validation_artifact.valid_train_file_path,
+                self.data_transformation_config.transformed_train_file_path,
+                self.data_transformation_config.transformed_train_target_file_path
+            )
+            self.transform_to_memmap(
+                preprocessing_obj,
+                self.data_validation_artifact.valid_test_file_path,
+                self.data_transformation_config.transformed_test_file_path,
+                self.data_transformation_config.transformed_test_target_file_path
+            )
+            scaler_path = self.save_transformer_objects(preprocessing_obj)
+
             return DataTransformationArtifact(
                 transformed_object_file_path=self.data_transformation_config.transformed_object_file_path,
                 transformed_train_file_path=self.data_transformation_config.transformed_train_file_path,
                 transformed_test_file_path=self.data_transformation_config.transformed_test_file_path,
-                scaler_object_file_path=scaler_path
+                scaler_object_file_path=scaler_path,
+                transformed_train_target_file_path=self.data_transformation_config.transformed_train_target_file_path,
+                transformed_test_target_file_path=self.data_transformation_config.transformed_test_target_file_path,
+                is_sparse=False,
+                feature_dtype=self.data_transformation_config.feature_dtype
+            )
+        except Exception as e:
+            logger.error('Error in streaming data transformation process.')
+            raise CustomException(e, sys)
+
+    def initiate_data_transformation(self) -> DataTransformationArtifact:
+        try:
+            if self.data_transformation_config.streaming:
+                return self.initiate_streaming_data_transformation()
+
+            logger.info('Starting data transformation process.')
+
+            X_train, y_train = self.load_features(self.data_validation_artifact.valid_train_file_path)
+            X_test, y_test = self.load_features(self.data_validation_artifact.valid_test_file_path)
+            logger.info(f"Train shape before transformation: {X_train.shape}")
+            logger.info(f"Test shape before transformation: {X_test.shape}")
+
+            # Get transformer objects
+            preprocessing_obj, ohe_obj, scaler_obj = self.get_transformer_object()
+
+            # Transform features
+            X_train_transformed = preprocessing_obj.fit_transform(X_train)
+            X_test_transformed = preprocessing_obj.transform(X_test)
+            logger.info("Feature transformation completed.")
+
+            # Save transformed arrays: float64 dense features are stacked with the target;
+            # sparse or reduced-precision features are stored apart from the float64 target
+            is_sparse = self.data_transformation_config.sparse_output
+            feature_dtype = self.data_transformation_config.feature_dtype
+            train_file_path = self.data_transformation_config.transformed_train_file_path
+            test_file_path = self.data_transformation_config.transformed_test_file_path
+            train_target_file_path = test_target_file_path = None
+            if is_sparse or np.dtype(feature_dtype) != np.float64:
+                train_target_file_path = self.data_transformation_config.transformed_train_target_file_path
+                test_target_file_path = self.data_transformation_config.transformed_test_target_file_path
+            if is_sparse:
+                train_file_path = train_file_path.replace(".npy", ".npz")
+                test_file_path = test_file_path.replace(".npy", ".npz")
+                logger.info(f"Sparse train matrix: {X_train_transformed.shape}, {X_train_transformed.nnz} non-zeros")
+            logger.info(f"Transformed features are {X_train_transformed.dtype} ({X_train_transformed.data.nbytes if is_sparse else X_train_transformed.nbytes} bytes for train)")
+            save_transformed_array(train_file_path, X_train_transformed, train_target_file_path, y_train)
+            save_transformed_array(test_file_path, X_test_transformed, test_target_file_path, y_test)
+            logger.info(f"Transformed train and test data saved to {os.path.dirname(train_file_path)}.")
+
+            scaler_path = self.save_transformer_objects(preprocessing_obj)
+
+            # Return artifact
+            return DataTransformationArtifact(
+                transformed_object_file_path=self.data_transformation_config.transformed_object_file_path,
+                transformed_train_file_path=train_file_path,
+                transformed_test_file_path=test_file_path,
+                scaler_object_file_path=scaler_path,
+                transformed_train_target_file_path=train_target_file_path,
+                transformed_test_target_file_path=test_target_file_path,
+                is_sparse=is_sparse,
+                feature_dtype=feature_dtype
             )
 
         except Exception as e:
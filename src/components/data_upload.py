@@ -1,53 +1,134 @@
-import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import pandas as pd
-from pymongo import MongoClient
-from dotenv import load_dotenv
+from pymongo import UpdateOne
+from pymongo.errors import AutoReconnect, BulkWriteError
 
 from src.utils.exception import CustomException
 from src.utils.log_config import logger  # fixed import
 from src.entity.config_entity import DataUploadConfig
+from src.utils.mongo_connection import get_mongo_client
 
-load_dotenv()
-MONGO_URL = os.getenv("MONGODB_URL")
+DUPLICATE_KEY_ERROR = 11000
+# Missing-value marker of the raw CSV (not among pandas' default NA strings)
+NA_VALUES = ["na"]
 
 
 class RawUploadPipeline:
-    def __init__(self):
+    def __init__(self, data_upload_config: DataUploadConfig = None, collection=None):
         try:
-            self.config = DataUploadConfig()
-            self.mongo_client = MongoClient(MONGO_URL)
+            self.config = data_upload_config or DataUploadConfig()
             db_name = self.config.database_name
             collection_name = self.config.collection_name
-            self.db = self.mongo_client[db_name]
-            self.collection = self.db[collection_name]
+            if collection is None:
+                # The shared pooled client serves every upload worker thread
+                self.mongo_client = get_mongo_client()
+                self.db = self.mongo_client[db_name]
+                collection = self.db[collection_name]
+            self.collection = collection
             logger.info(f"Initialized MongoDB client for database: {db_name}, collection: {collection_name}")
         except Exception as e:
             logger.error("Error initializing RawUploadPipeline")
             raise CustomException(e, sys)
 
-    def upload_raw_csv(self):
+    def _infer_column_types(self, raw_file_path: str) -> tuple:
+        """Numeric columns of the file, and ``read_csv`` dtypes pinning the others to object.
+
+        Types are fixed up front so every chunk (and every run) parses identically,
+        which keeps row hashes stable in upsert mode. Numerics get no hard dtype:
+        ``_prepare_chunk`` coerces them, so a stray value past the sample cannot
+        fail the upload midway.
+        """
+        sample = pd.read_csv(raw_file_path, nrows=self.config.chunk_size, na_values=NA_VALUES)
+        numeric_columns = [col for col in sample.columns if pd.api.types.is_numeric_dtype(sample[col])]
+        return numeric_columns, {col: "object" for col in sample.columns if col not in numeric_columns}
+
+    def _prepare_chunk(self, df: pd.DataFrame, numeric_columns: list = ()) -> list:
+        for col in numeric_columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+
+        # Drop unnecessary columns if present
+        drop_cols = ["Unnamed: 0", "index"]
+        df = df.drop(columns=[col for col in drop_cols if col in df.columns], errors='ignore')
+        df.reset_index(drop=True, inplace=True)
+
+        records = df.to_dict(orient="records")
+        if self.config.upsert:
+            row_hashes = pd.util.hash_pandas_object(df, index=False).map("{:016x}".format)
+            for record, row_hash in zip(records, row_hashes):
+                record[self.config.row_hash_field] = row_hash
+        return records
+
+    def _write_batch(self, records: list) -> int:
+        """Write one batch unordered, retrying transient failures with backoff.
+
+        Retries are safe in both modes: upserts are keyed on the row hash, and
+        insert_many assigns ``_id`` to the records before sending them, so a
+        re-sent insert only produces duplicate key errors for rows that landed.
+        """
+        for attempt in range(self.config.max_retries + 1):
+            try:
+                if self.config.upsert:
+                    field = self.config.row_hash_field
+                    operations = [
+                        UpdateOne({field: record[field]}, {"$setOnInsert": record}, upsert=True)
+                        for record in records
+                    ]
+                    self.collection.bulk_write(operations, ordered=False)
+                else:
+                    self.collection.insert_many(records, ordered=False)
+                return len(records)
+            except BulkWriteError as e:
+                write_errors = e.details.get("writeErrors", [])
+                if attempt > 0 and all(err.get("code") == DUPLICATE_KEY_ERROR for err in write_errors):
+                    return len(records)
+                if attempt == self.config.max_retries:
+                    raise
+                logger.warning(f"Batch of {len(records)} rows failed ({len(write_errors)} write errors), retrying")
+            except AutoReconnect:
+                if attempt == self.config.max_retries:
+                    raise
+                logger.warning(f"Connection error on batch of {len(records)} rows, retrying")
+            time.sleep(2 ** attempt)
+
+    def upload_raw_csv(self) -> int:
         try:
             raw_file_path = self.config.raw_data_path
-            logger.info(f"Uploading raw CSV from {raw_file_path} to MongoDB")
+            logger.info(f"Uploading raw CSV from {raw_file_path} to MongoDB in chunks of {self.config.chunk_size}")
 
-            df = pd.read_csv(raw_file_path)
+            if self.config.upsert:
+                self.collection.create_index(self.config.row_hash_field, unique=True)
 
-            # Drop unnecessary columns if present
-            drop_cols = ["Unnamed: 0", "index"]
-            df = df.drop(columns=[col for col in drop_cols if col in df.columns], errors='ignore')
-            df.reset_index(drop=True, inplace=True)
+            start = time.perf_counter()
+            total_rows = 0
+            in_flight = set()
+            numeric_columns, dtype = self._infer_column_types(raw_file_path)
+            reader = pd.read_csv(raw_file_path, chunksize=self.config.chunk_size, na_values=NA_VALUES, dtype=dtype)
+            with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
+                for chunk in reader:
+                    in_flight.add(executor.submit(self._write_batch, self._prepare_chunk(chunk, numeric_columns)))
+                    # Bound memory: stop reading until a batch slot frees up
+                    if len(in_flight) >= self.config.max_in_flight:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        total_rows += sum(future.result() for future in done)
+                        elapsed = time.perf_counter() - start
+                        logger.info(f"Uploaded {total_rows} rows ({total_rows / elapsed:.0f} rows/sec)")
+                done, _ = wait(in_flight)
+                total_rows += sum(future.result() for future in done)
 
-            # Convert to JSON records and insert
-            json_records = df.to_dict(orient="records")
-            self.collection.insert_many(json_records)
-            logger.info(f"Successfully uploaded {len(json_records)} records to MongoDB")
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"Successfully uploaded {total_rows} records to MongoDB in {elapsed:.1f}s "
+                f"({total_rows / max(elapsed, 1e-9):.0f} rows/sec)"
+            )
+            return total_rows
         except Exception as e:
             logger.error("Error occurred while uploading data to MongoDB")
             raise CustomException(e, sys)
 
     def run(self):
-        self.upload_raw_csv()
+        return self.upload_raw_csv()
 
 
 if __name__ == "__main__":
@@ -2,13 +2,21 @@ import os
 import sys
 from dataclasses import dataclass
 import pandas as pd
-from scipy.stats import ks_2samp
 from src.utils.exception import CustomException
 from src.utils.log_config import logger
 from src.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact
 from src.entity.config_entity import DataValidationConfig
-from src.utils.main_utils import read_yaml_file, write_yaml_file
-from src.constant import SCHEMA_FILE_PATH
+from src.utils.main_utils import (
+    read_yaml_file,
+    write_yaml_file,
+    read_table,
+    get_table_columns,
+    iter_table_chunks,
+    list_previous_artifact_dirs,
+    TableWriter,
+)
+from src.utils.drift_utils import compute_drift_report, compute_drift_report_from_profile, build_reference_profile
+from src.constant import SCHEMA_FILE_PATH, ARTIFACT_TIMESTAMP_FORMAT
 
 class DataValidation:
     def __init__(self, data_ingestion_artifact: DataIngestionArtifact, data_validation_config: DataValidationConfig):
@@ -16,39 +24,108 @@ class DataValidation:
             self.data_ingestion_artifact = data_ingestion_artifact
             self.data_validation_config = data_validation_config
             self.schema_config = read_yaml_file(SCHEMA_FILE_PATH)
+            self.column_specs = self.schema_config.get('column_specs', {})
         except Exception as e:
             raise CustomException(e, sys)
 
-    @staticmethod
-    def read_data(file_path) -> pd.DataFrame:
+    def read_data(self, file_path) -> pd.DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return read_table(file_path, columns=self.schema_config['columns'])
         except Exception as e:
             raise CustomException(e, sys)
 
-    def validate_number_of_columns(self, dataframe: pd.DataFrame) -> bool:
+    def validate_number_of_columns(self, columns: list) -> bool:
         try:
             expected_columns = self.schema_config['columns']  # get list of columns
-            logger.info(f"Expected columns: {len(expected_columns)}, Dataframe columns: {len(dataframe.columns)}")
-            missing_cols = [col for col in expected_columns if col not in dataframe.columns]
+            logger.info(f"Expected columns: {len(expected_columns)}, Dataframe columns: {len(columns)}")
+            missing_cols = [col for col in expected_columns if col not in columns]
             if missing_cols:
                 logger.warning(f"Missing columns: {missing_cols}")
             return len(missing_cols) == 0
         except Exception as e:
             raise CustomException(e, sys)
 
-    def detect_dataset_drift(self, base_df: pd.DataFrame, current_df: pd.DataFrame, threshold: float = 0.05) -> bool:
+    def get_schema_violations(self, dataframe: pd.DataFrame) -> pd.Series:
+        """Return, per row, the first schema rule it breaks (``""`` for valid rows)."""
+        reasons = pd.Series("", index=dataframe.index, dtype=object)
+        for col, spec in self.column_specs.items():
+            values = dataframe[col]
+            checks = []
+            if spec.get("dtype") == "float":
+                numeric = pd.to_numeric(values, errors="coerce")
+                checks.append((numeric.isna() & values.notna(), "dtype"))
+                values = numeric
+            if not spec.get("nullable", True):
+                checks.append((values.isna(), "null"))
+            if "min" in spec:
+                checks.append((values < spec["min"], "min"))
+            if "max" in spec:
+                checks.append((values > spec["max"], "max"))
+            if "allowed" in spec:
+                checks.append((values.notna() & ~values.isin(spec["allowed"]), "allowed"))
+            for failed, rule in checks:
+                reasons = reasons.mask(failed.to_numpy() & (reasons == ""), f"{col}:{rule}")
+        return reasons
+
+    def cast_to_schema(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        dataframe = dataframe.copy()
+        for col, spec in self.column_specs.items():
+            if spec.get("dtype") == "float":
+                dataframe[col] = pd.to_numeric(dataframe[col], errors="coerce").astype("float64")
+            elif spec.get("dtype") == "category":
+                dataframe[col] = pd.Categorical(dataframe[col], categories=spec.get("allowed"))
+        return dataframe
+
+    def validate_file(self, file_path: str, valid_file_path: str, invalid_file_path: str):
+        """Check ``file_path`` chunk by chunk and split it into valid and quarantined rows.
+
+        Returns ``(valid_rows, invalid_rows)``; the invalid file, with an
+        ``invalid_reason`` column, is only written when some row fails.
+        """
         try:
-            status = True
-            report = {}
-            for column in base_df.columns:
-                d1 = base_df[column]
-                d2 = current_df[column]
-                ks_test = ks_2samp(d1, d2)
-                drift_detected = ks_test.pvalue < threshold
-                if drift_detected:
-                    status = False
-                report[column] = {"p_value": float(ks_test.pvalue), "drift_status": drift_detected}
+            columns = get_table_columns(file_path)
+            if not self.validate_number_of_columns(columns):
+                raise ValueError(f"{file_path} does not contain all columns required by {SCHEMA_FILE_PATH}")
+
+            invalid_writer = None
+            violation_counts = pd.Series(dtype=int)
+            with TableWriter(valid_file_path) as valid_writer:
+                for chunk in iter_table_chunks(
+                    file_path, columns=self.schema_config['columns'], chunk_size=self.data_validation_config.chunk_size
+                ):
+                    reasons = self.get_schema_violations(chunk)
+                    invalid_mask = (reasons != "").to_numpy()
+                    valid_writer.write(self.cast_to_schema(chunk[~invalid_mask]))
+                    if invalid_mask.any():
+                        invalid_writer = invalid_writer or TableWriter(invalid_file_path)
+                        invalid_writer.write(chunk[invalid_mask].assign(invalid_reason=reasons[invalid_mask]))
+                        violation_counts = violation_counts.add(reasons[invalid_mask].value_counts(), fill_value=0)
+                valid_rows = valid_writer.rows
+            invalid_rows = 0
+            if invalid_writer is not None:
+                invalid_writer.close()
+                invalid_rows = invalid_writer.rows
+                logger.warning(
+                    f"Quarantined {invalid_rows} rows of {file_path} to {invalid_file_path}: "
+                    f"{violation_counts.astype(int).to_dict()}"
+                )
+            elif os.path.exists(invalid_file_path):
+                os.remove(invalid_file_path)
+            if valid_rows == 0:
+                raise ValueError(f"No rows of {file_path} passed schema validation")
+            return valid_rows, invalid_rows
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def detect_dataset_drift(self, base_df: pd.DataFrame, current_df: pd.DataFrame, threshold: float = None) -> bool:
+        try:
+            status, report = compute_drift_report(
+                base_df,
+                current_df,
+                threshold=threshold if threshold is not None else self.data_validation_config.drift_threshold,
+                psi_bins=self.data_validation_config.psi_bins,
+                max_workers=self.data_validation_config.drift_max_workers,
+            )
 
             drift_report_path = self.data_validation_config.drift_report_file_path
             os.makedirs(os.path.dirname(drift_report_path), exist_ok=True)
@@ -58,32 +135,86 @@ class DataValidation:
         except Exception as e:
             raise CustomException(e, sys)
 
-    def initiate_data_validation(self) -> DataValidationArtifact:
+    def save_reference_profile(self, dataframe: pd.DataFrame) -> dict:
         try:
-            train_df = self.read_data(self.data_ingestion_artifact.trained_file_path)
-            test_df = self.read_data(self.data_ingestion_artifact.test_file_path)
+            profile = build_reference_profile(dataframe, psi_bins=self.data_validation_config.psi_bins)
+            write_yaml_file(self.data_validation_config.reference_profile_file_path, profile)
+            logger.info(f"Saved reference profile at {self.data_validation_config.reference_profile_file_path}")
+            return profile
+        except Exception as e:
+            raise CustomException(e, sys)
 
-            # Column validation
-            if not self.validate_number_of_columns(train_df):
-                logger.warning("Train dataframe does not contain all required columns")
-            if not self.validate_number_of_columns(test_df):
-                logger.warning("Test dataframe does not contain all required columns")
+    def load_cached_reference_profile(self):
+        """Return ``(profile, path)`` of the latest earlier run's reference profile, if any."""
+        try:
+            relative_path = os.path.relpath(
+                self.data_validation_config.reference_profile_file_path, self.data_validation_config.artifact_dir
+            )
+            for run_dir in list_previous_artifact_dirs(
+                self.data_validation_config.artifact_root,
+                self.data_validation_config.artifact_dir,
+                ARTIFACT_TIMESTAMP_FORMAT,
+            ):
+                profile_path = os.path.join(run_dir, relative_path)
+                if os.path.exists(profile_path):
+                    return read_yaml_file(profile_path), profile_path
+            return None, None
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def detect_drift_against_profile(self, profile: dict, current_df: pd.DataFrame) -> bool:
+        try:
+            status, report = compute_drift_report_from_profile(
+                profile,
+                current_df,
+                threshold=self.data_validation_config.drift_threshold,
+                max_workers=self.data_validation_config.drift_max_workers,
+            )
+            drift_report_path = self.data_validation_config.drift_report_file_path
+            write_yaml_file(file_path=drift_report_path, content=report)
+            return status
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def initiate_data_validation(self) -> DataValidationArtifact:
+        try:
+            # Schema validation: bad rows are quarantined before transformation and training
+            _, invalid_train_rows = self.validate_file(
+                self.data_ingestion_artifact.trained_file_path,
+                self.data_validation_config.valid_train_file_path,
+                self.data_validation_config.invalid_train_file_path,
+            )
+            _, invalid_test_rows = self.validate_file(
+                self.data_ingestion_artifact.test_file_path,
+                self.data_validation_config.valid_test_file_path,
+                self.data_validation_config.invalid_test_file_path,
+            )
+            train_df = self.read_data(self.data_validation_config.valid_train_file_path)
+            test_df = self.read_data(self.data_validation_config.valid_test_file_path)
 
-            # Dataset drift detection
-            drift_status = self.detect_dataset_drift(base_df=train_df, current_df=test_df)
+            # Profile this run's training data for later runs and serving-time monitoring
+            self.save_reference_profile(train_df)
 
-            # Save validated data
-            os.makedirs(os.path.dirname(self.data_validation_config.valid_train_file_path), exist_ok=True)
-            train_df.to_csv(self.data_validation_config.valid_train_file_path, index=False, header=True)
-            test_df.to_csv(self.data_validation_config.valid_test_file_path, index=False, header=True)
+            # Dataset drift detection against the cached reference; without one, compare
+            # this run's splits exactly
+            reference_profile, reference_path = (None, None)
+            if self.data_validation_config.use_cached_reference:
+                reference_profile, reference_path = self.load_cached_reference_profile()
+            if reference_profile is not None:
+                logger.info(f"Checking drift of current data against reference profile {reference_path}")
+                drift_status = self.detect_drift_against_profile(reference_profile, test_df)
+            else:
+                logger.info("No cached reference profile; checking drift of the test split against the train split")
+                drift_status = self.detect_dataset_drift(train_df, test_df)
 
             return DataValidationArtifact(
                 validation_status=drift_status,
                 valid_train_file_path=self.data_validation_config.valid_train_file_path,
                 valid_test_file_path=self.data_validation_config.valid_test_file_path,
-                invalid_train_file_path=None,
-                invalid_test_file_path=None,
-                drift_report_file_path=self.data_validation_config.drift_report_file_path
+                invalid_train_file_path=self.data_validation_config.invalid_train_file_path if invalid_train_rows else None,
+                invalid_test_file_path=self.data_validation_config.invalid_test_file_path if invalid_test_rows else None,
+                drift_report_file_path=self.data_validation_config.drift_report_file_path,
+                reference_profile_file_path=self.data_validation_config.reference_profile_file_path
             )
 
         except Exception as e:
@@ -1,22 +1,83 @@
 import os
 import sys
+import time
+from contextlib import nullcontext
 import joblib
-import mlflow
-import mlflow.sklearn
-import dagshub
+import pickle
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sklearn.base import clone
+from scipy.sparse import issparse, csr_matrix
+from threadpoolctl import threadpool_limits
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.linear_model import Lasso
-from mlflow.models.signature import infer_signature
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor, HistGradientBoostingRegressor
+from sklearn.linear_model import Lasso, SGDRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer
 
 from src.utils.exception import CustomException
 from src.utils.log_config import logger
 from src.entity.artifact_entity import ModelTrainerArtifact, RegressionMetricArtifact, DataTransformationArtifact
 from src.entity.config_entity import ModelTrainerConfig
+from src.utils.main_utils import load_transformed_array
+from src.utils.model_search import SuccessiveHalvingSearch, budget_params
+from src.utils.tracking import get_tracker
 
-# Initialize DagsHub
-dagshub.init(repo_owner='nakul-3205', repo_name='AutoSense_Ai', mlflow=True, dvc=True)
+
+# Estimators parallelised with OpenMP rather than n_jobs; their thread count is
+# set through threadpoolctl
+OPENMP_ESTIMATORS = (HistGradientBoostingRegressor,)
+
+
+def is_multithreaded(model) -> bool:
+    steps = [step for _, step in model.steps] if isinstance(model, Pipeline) else [model]
+    return any("n_jobs" in step.get_params() or isinstance(step, OPENMP_ESTIMATORS) for step in steps)
+
+
+def one_hot_to_ordinal(preprocessing_obj, dtype, is_sparse: bool) -> FunctionTransformer:
+    """Map the preprocessor output back to one integer code per categorical column.
+
+    Each one-hot block is projected onto ``1..k`` (0 for categories unseen by
+    the encoder) and the scaled numerics pass through, all as one matrix
+    product. Only numpy/sklearn objects are involved, so the fitted model
+    unpickles anywhere the preprocessor does and accepts its output unchanged.
+    """
+    ohe_slice = preprocessing_obj.output_indices_['ohe']
+    numeric_slice = preprocessing_obj.output_indices_['scaler']
+    sizes = [len(categories) for categories in preprocessing_obj.named_transformers_['ohe'].categories_]
+    n_features = len(preprocessing_obj.get_feature_names_out())
+
+    projection = np.zeros((n_features, len(sizes) + numeric_slice.stop - numeric_slice.start), dtype=dtype)
+    offset = ohe_slice.start
+    for j, size in enumerate(sizes):
+        projection[offset:offset + size, j] = np.arange(1, size + 1)
+        offset += size
+    for i, column in enumerate(range(numeric_slice.start, numeric_slice.stop)):
+        projection[column, len(sizes) + i] = 1
+    if is_sparse:
+        return FunctionTransformer(csr_matrix.dot, kw_args={'other': projection}, accept_sparse=True)
+    return FunctionTransformer(np.dot, kw_args={'b': projection})
+
+
+def fit_candidate(model_name: str, model, n_jobs: int, data_paths: tuple):
+    """Fit and score one candidate; runs inside a worker process.
+
+    The worker maps the transformed ``.npy`` files itself (read-only, so every
+    worker shares the same page cache) rather than receiving pickled arrays,
+    and keeps both estimator and BLAS threads within its ``n_jobs`` core share.
+    """
+    train_file_path, test_file_path, train_target_file_path, test_target_file_path = data_paths
+    X_train, y_train = load_transformed_array(train_file_path, train_target_file_path, mmap_mode='r')
+    X_test, y_test = load_transformed_array(test_file_path, test_target_file_path, mmap_mode='r')
+    if "n_jobs" in model.get_params():
+        model.set_params(n_jobs=n_jobs)
+
+    start = time.perf_counter()
+    with threadpool_limits(limits=n_jobs):
+        model.fit(X_train, y_train)
+        train_metrics = ModelTrainer.evaluate_model(model, X_train, y_train)
+        test_metrics = ModelTrainer.evaluate_model(model, X_test, y_test)
+    return model_name, model, train_metrics, test_metrics, time.perf_counter() - start
 
 
 class ModelTrainer:
@@ -32,21 +93,134 @@ class ModelTrainer:
         r2 = r2_score(y, preds)
         return RegressionMetricArtifact(mae=mae, rmse=rmse, r2=r2)
 
-    def initiate_model_trainer(self) -> ModelTrainerArtifact:
-        try:
-            # Load transformed data
-            train_arr = np.load(self.data_transformation_artifact.transformed_train_file_path)
-            test_arr = np.load(self.data_transformation_artifact.transformed_test_file_path)
+    def get_hist_gradient_boosting(self) -> Pipeline:
+        """Histogram boosting on native categoricals, behind the one-hot to ordinal projection."""
+        with open(self.data_transformation_artifact.transformed_object_file_path, 'rb') as f:
+            preprocessing_obj = pickle.load(f)
+        n_categorical = len(preprocessing_obj.named_transformers_['ohe'].categories_)
+        return Pipeline([
+            ('to_ordinal', one_hot_to_ordinal(
+                preprocessing_obj,
+                self.data_transformation_artifact.feature_dtype,
+                self.data_transformation_artifact.is_sparse
+            )),
+            ('model', HistGradientBoostingRegressor(
+                categorical_features=list(range(n_categorical)),
+                max_iter=500,
+                early_stopping=True,
+                validation_fraction=0.1,
+                n_iter_no_change=10,
+                random_state=42
+            ))
+        ])
+
+    def get_candidate_models(self) -> dict:
+        # Reduced model complexity to save time and prevent overfitting
+        return {
+            "RandomForest": RandomForestRegressor(n_estimators=50, max_depth=12, n_jobs=-1, random_state=42),
+            "GradientBoosting": GradientBoostingRegressor(n_estimators=50, max_depth=6, random_state=42),
+            "HistGradientBoosting": self.get_hist_gradient_boosting(),
+            "Lasso": Lasso(alpha=0.001),
+            # Averaged SGD stays stable under partial_fit, so incremental updates can extend it
+            "SGD": SGDRegressor(average=True, random_state=42)
+        }
+
+    @staticmethod
+    def allocate_cores(models: dict, core_budget: int) -> dict:
+        """Split ``core_budget`` between candidates.
 
-            X_train, y_train = train_arr[:, :-1], train_arr[:, -1]
-            X_test, y_test = test_arr[:, :-1], test_arr[:, -1]
+        Single-threaded models get one core each; the remaining cores are
+        shared evenly by the models that can use them.
+        """
+        parallel = [name for name, model in models.items() if is_multithreaded(model)]
+        serial = [name for name in models if name not in parallel]
+        spare = max(core_budget - len(serial), len(parallel))
+        cores = {name: 1 for name in serial}
+        for i, name in enumerate(parallel):
+            cores[name] = spare // len(parallel) + (1 if i < spare % len(parallel) else 0)
+        return cores
 
-            # Reduced model complexity to save time and prevent overfitting
-            models = {
-                "RandomForest": RandomForestRegressor(n_estimators=50, max_depth=12, n_jobs=-1, random_state=42),
-                "GradientBoosting": GradientBoostingRegressor(n_estimators=50, max_depth=6, random_state=42),
-                "Lasso": Lasso(alpha=0.001)
-            }
+    def log_candidate(self, model_name, model, train_metrics, test_metrics, X_sample) -> None:
+        """Queue one candidate for experiment tracking; returns without waiting on the server."""
+        estimator = model[-1] if isinstance(model, Pipeline) else model
+        get_tracker().log_run(
+            model_name,
+            params={**estimator.get_params(), "feature_dtype": str(X_sample.dtype)},
+            metrics={
+                "train_mae": train_metrics.mae,
+                "train_rmse": train_metrics.rmse,
+                "train_r2": train_metrics.r2,
+                "test_mae": test_metrics.mae,
+                "test_rmse": test_metrics.rmse,
+                "test_r2": test_metrics.r2
+            },
+            model=model,
+            input_example=X_sample,
+        )
+
+    def log_trial(self, trial: dict) -> None:
+        """Queue one search trial for experiment tracking."""
+        get_tracker().log_run(
+            f"{trial['model']}-trial-{trial['id']}",
+            params={**trial["params"], "resource": trial["resource"], "rows": trial["rows"]},
+            metrics={"val_r2": trial["score"], "cpu_seconds": trial["cpu_seconds"]},
+            tags={"search_model": trial["model"], "search_rung": trial["rung"]},
+        )
+
+    def search_hyperparameters(self, models: dict, data_paths: tuple, executor) -> dict:
+        """Tune ``models`` within the CPU budget and return them set to their best configurations."""
+        search = SuccessiveHalvingSearch(
+            self.config.search_space,
+            data_paths,
+            eta=self.config.search_eta,
+            min_resource=self.config.search_min_resource,
+            n_candidates=self.config.search_n_candidates,
+            max_estimators=self.config.search_max_estimators,
+            budget_seconds=self.config.search_budget_seconds,
+            validation_fraction=self.config.search_validation_fraction,
+            on_trial=self.log_trial,
+        )
+        best = search.run(models, executor=executor)
+        logger.info(f"Hyperparameter search used {search.cpu_seconds:.0f} CPU seconds")
+        tuned = {}
+        for model_name, model in models.items():
+            params = best[model_name]["params"] if best[model_name] else {}
+            tuned[model_name] = clone(model).set_params(
+                **params, **budget_params(model, 1.0, self.config.search_max_estimators)
+            )
+        return tuned
+
+    def train_candidates(self, models: dict, data_paths: tuple, executor=None):
+        """Yield ``fit_candidate`` results as candidates finish."""
+        core_budget = self.config.core_budget or os.cpu_count() or 1
+        cores = self.allocate_cores(models, core_budget)
+        if executor is None:
+            for model_name, model in models.items():
+                logger.info(f"Training model: {model_name}")
+                yield fit_candidate(model_name, model, core_budget, data_paths)
+            return
+
+        logger.info(f"Training {len(models)} candidates in parallel with core budget {cores}")
+        futures = [
+            executor.submit(fit_candidate, model_name, model, cores[model_name], data_paths)
+            for model_name, model in models.items()
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+    def initiate_model_trainer(self) -> ModelTrainerArtifact:
+        try:
+            artifact = self.data_transformation_artifact
+            data_paths = (
+                artifact.transformed_train_file_path,
+                artifact.transformed_test_file_path,
+                artifact.transformed_train_target_file_path,
+                artifact.transformed_test_target_file_path,
+            )
+            # Tracked model signatures and input examples need dense rows
+            X_train, _ = load_transformed_array(data_paths[0], data_paths[2], mmap_mode='r')
+            X_sample = X_train[:5].toarray() if issparse(X_train) else np.asarray(X_train[:5])
+            del X_train
 
             best_r2 = -float("inf")
             best_model = None
@@ -54,40 +228,34 @@ class ModelTrainer:
             best_test_metrics = None
             best_model_name = ""
 
-            for model_name, model in models.items():
-                logger.info(f"Training model: {model_name}")
-                model.fit(X_train, y_train)
-
-                train_metrics = self.evaluate_model(model, X_train, y_train)
-                test_metrics = self.evaluate_model(model, X_test, y_test)
-
-                signature = infer_signature(X_train, model.predict(X_train[:5]))
-                input_example = X_train[:1]
-
-                # Log metrics to MLflow
-                with mlflow.start_run(run_name=model_name):
-                    mlflow.log_params(model.get_params() if hasattr(model, "get_params") else {})
-                    mlflow.log_metrics({
-                        "train_mae": train_metrics.mae,
-                        "train_rmse": train_metrics.rmse,
-                        "train_r2": train_metrics.r2,
-                        "test_mae": test_metrics.mae,
-                        "test_rmse": test_metrics.rmse,
-                        "test_r2": test_metrics.r2
-                    })
-                    mlflow.sklearn.log_model(model, "model", signature=signature, input_example=input_example)
-
-                # Update best model
-                if test_metrics.r2 > best_r2:
-                    best_r2 = test_metrics.r2
-                    best_model = model
-                    best_train_metrics = train_metrics
-                    best_test_metrics = test_metrics
-                    best_model_name = model_name
-
-            # Save the best model locally (compressed)
-            os.makedirs(os.path.dirname(self.config.trained_model_file_path), exist_ok=True)
-            joblib.dump(best_model, self.config.trained_model_file_path, compress=('gzip', 3))
+            start = time.perf_counter()
+            models = self.get_candidate_models()
+            use_pool = self.config.parallel or self.config.search
+            core_budget = self.config.core_budget or os.cpu_count() or 1
+            # One worker pool serves both the search trials and the final fits
+            pool = ProcessPoolExecutor(max_workers=max(core_budget, len(models))) if use_pool else nullcontext()
+            with pool:
+                if self.config.search:
+                    models = self.search_hyperparameters(models, data_paths, pool)
+
+                for model_name, model, train_metrics, test_metrics, elapsed in self.train_candidates(
+                    models, data_paths, pool if self.config.parallel else None
+                ):
+                    logger.info(f"{model_name} trained in {elapsed:.1f}s, test r2={test_metrics.r2:.4f}")
+                    self.log_candidate(model_name, model, train_metrics, test_metrics, X_sample)
+
+                    # Update best model
+                    if test_metrics.r2 > best_r2:
+                        best_r2 = test_metrics.r2
+                        best_model = model
+                        best_train_metrics = train_metrics
+                        best_test_metrics = test_metrics
+                        best_model_name = model_name
+                logger.info(f"Model selection took {time.perf_counter() - start:.1f}s, best: {best_model_name}")
+
+                # Save the best model locally (compressed)
+                os.makedirs(os.path.dirname(self.config.trained_model_file_path), exist_ok=True)
+                joblib.dump(best_model, self.config.trained_model_file_path, compress=('gzip', 3))
 
             return ModelTrainerArtifact(
                 trained_model_file_path=self.config.trained_model_file_path,
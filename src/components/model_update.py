@@ -0,0 +1,189 @@
+import copy
+import math
+import os
+import pickle
+import sys
+import joblib
+
+from src.components.data_transformation import DataTransformation
+from src.components.model_training import ModelTrainer
+from src.entity.artifact_entity import ModelPromotionArtifact, ModelUpdateArtifact
+from src.entity.config_entity import ModelUpdateConfig
+from src.utils.exception import CustomException
+from src.utils.log_config import logger
+
+
+class ModelPromoter:
+    """Gate models into ``best_model/``, the copy that is served.
+
+    A candidate replaces the incumbent only when it scores better on the
+    holdout split, each model scored through its own preprocessor, so a
+    worse model never reaches serving.
+    """
+
+    def __init__(self, config: ModelUpdateConfig, holdout_file_path: str):
+        self.config = config
+        self.holdout_file_path = holdout_file_path
+
+    def load_incumbent(self):
+        """Return ``(model, preprocessing_obj)`` currently served, or ``(None, None)``."""
+        try:
+            if not (os.path.exists(self.config.best_model_file_path)
+                    and os.path.exists(self.config.best_preprocessing_object_file_path)):
+                return None, None
+            with open(self.config.best_preprocessing_object_file_path, 'rb') as f:
+                preprocessing_obj = pickle.load(f)
+            return joblib.load(self.config.best_model_file_path), preprocessing_obj
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def promote(self, model, preprocessing_obj=None) -> None:
+        """Atomically replace the served model (and preprocessor), so readers never see a partial file."""
+        try:
+            replacements = []
+            if preprocessing_obj is not None:
+                os.makedirs(os.path.dirname(self.config.best_preprocessing_object_file_path), exist_ok=True)
+                tmp_path = self.config.best_preprocessing_object_file_path + ".tmp"
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(preprocessing_obj, f)
+                replacements.append((tmp_path, self.config.best_preprocessing_object_file_path))
+            tmp_path = self.config.best_model_file_path + ".tmp"
+            joblib.dump(model, tmp_path, compress=('gzip', 3))
+            replacements.append((tmp_path, self.config.best_model_file_path))
+            for tmp_path, path in replacements:
+                os.replace(tmp_path, path)
+            logger.info(f"Promoted model to {self.config.best_model_file_path}")
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def initiate_model_promotion(self, model_file_path: str, preprocessing_object_file_path: str) -> ModelPromotionArtifact:
+        """Promote a freshly trained model and its preprocessor if they beat the incumbent."""
+        try:
+            with open(preprocessing_object_file_path, 'rb') as f:
+                preprocessing_obj = pickle.load(f)
+            model = joblib.load(model_file_path)
+            X_holdout, y_holdout = DataTransformation().load_features(self.holdout_file_path)
+            candidate_metrics = ModelTrainer.evaluate_model(model, preprocessing_obj.transform(X_holdout), y_holdout)
+
+            incumbent, incumbent_preprocessing_obj = self.load_incumbent()
+            incumbent_metrics = None
+            if incumbent is not None:
+                try:
+                    incumbent_metrics = ModelTrainer.evaluate_model(
+                        incumbent, incumbent_preprocessing_obj.transform(X_holdout), y_holdout
+                    )
+                except Exception as e:
+                    # e.g. the schema changed since it was trained; it cannot compete then
+                    logger.warning(f"Served model cannot score the holdout split ({e}); replacing it")
+
+            if incumbent_metrics is None:
+                is_promoted = True
+                logger.info(f"Holdout r2: {candidate_metrics.r2:.4f}, no comparable served model")
+            else:
+                is_promoted = bool(candidate_metrics.r2 > incumbent_metrics.r2 + self.config.min_improvement)
+                logger.info(f"Holdout r2: incumbent {incumbent_metrics.r2:.4f}, new {candidate_metrics.r2:.4f}")
+            if is_promoted:
+                self.promote(model, preprocessing_obj)
+            else:
+                logger.info("New model is not better than the incumbent; keeping the incumbent")
+
+            return ModelPromotionArtifact(
+                model_file_path=model_file_path,
+                incumbent_metric_artifact=incumbent_metrics,
+                candidate_metric_artifact=candidate_metrics,
+                is_promoted=is_promoted
+            )
+        except Exception as e:
+            logger.error("Error during model promotion")
+            raise CustomException(e, sys)
+
+
+class ModelUpdater(ModelPromoter):
+    """Continue training the served model on newly ingested rows only.
+
+    The incumbent in ``best_model/`` is copied and extended with the delta:
+    estimators with ``partial_fit`` (the SGD candidate) take a few passes over
+    it, and ``warm_start`` tree ensembles grow extra trees fitted on it. The
+    updated copy is then gated like any other candidate.
+    """
+
+    def __init__(
+        self,
+        config: ModelUpdateConfig,
+        delta_train_file_path: str,
+        holdout_file_path: str,
+        delta_rows: int,
+        total_rows: int,
+    ):
+        super().__init__(config, holdout_file_path)
+        self.delta_train_file_path = delta_train_file_path
+        self.delta_rows = delta_rows
+        self.total_rows = total_rows
+
+    def update_model(self, model, X, y) -> str:
+        """Extend ``model`` in place with ``(X, y)``; returns the method used, or None if unsupported."""
+        params = model.get_params()
+        if hasattr(model, "partial_fit"):
+            for _ in range(self.config.sgd_epochs):
+                model.partial_fit(X, y)
+            return "partial_fit"
+        if "warm_start" in params and "n_estimators" in params:
+            # New trees in proportion to the share of new rows
+            n_estimators = params["n_estimators"]
+            previous_rows = max(self.total_rows - self.delta_rows, 1)
+            new_trees = max(self.config.min_new_trees, math.ceil(n_estimators * self.delta_rows / previous_rows))
+            if n_estimators + new_trees > self.config.max_estimators:
+                logger.info(f"Model already has {n_estimators} trees; a full retrain is due")
+                return None
+            model.set_params(warm_start=True, n_estimators=n_estimators + new_trees)
+            model.fit(X, y)
+            model.set_params(warm_start=False)
+            return f"warm_start(+{new_trees} trees)"
+        return None
+
+    def initiate_model_update(self) -> ModelUpdateArtifact:
+        """Returns None when there is no incumbent or it cannot be updated incrementally."""
+        try:
+            incumbent, preprocessing_obj = self.load_incumbent()
+            if incumbent is None:
+                logger.info("No served model to update")
+                return None
+
+            # The delta must be encoded exactly as the incumbent's training data was
+            data_transformation = DataTransformation()
+            X_delta, y_delta = data_transformation.load_features(self.delta_train_file_path)
+            X_holdout, y_holdout = data_transformation.load_features(self.holdout_file_path)
+            X_delta = preprocessing_obj.transform(X_delta)
+            X_holdout = preprocessing_obj.transform(X_holdout)
+            logger.info(f"Updating {type(incumbent).__name__} on {X_delta.shape[0]} new rows")
+
+            updated = copy.deepcopy(incumbent)
+            update_method = self.update_model(updated, X_delta, y_delta)
+            if update_method is None:
+                logger.info(f"{type(incumbent).__name__} cannot be updated incrementally")
+                return None
+
+            incumbent_metrics = ModelTrainer.evaluate_model(incumbent, X_holdout, y_holdout)
+            updated_metrics = ModelTrainer.evaluate_model(updated, X_holdout, y_holdout)
+            logger.info(
+                f"Holdout r2: incumbent {incumbent_metrics.r2:.4f}, updated {updated_metrics.r2:.4f} ({update_method})"
+            )
+
+            os.makedirs(os.path.dirname(self.config.updated_model_file_path), exist_ok=True)
+            joblib.dump(updated, self.config.updated_model_file_path, compress=('gzip', 3))
+            is_promoted = bool(updated_metrics.r2 > incumbent_metrics.r2 + self.config.min_improvement)
+            if is_promoted:
+                self.promote(updated)
+            else:
+                logger.info("Updated model is not better than the incumbent; keeping the incumbent")
+
+            return ModelUpdateArtifact(
+                updated_model_file_path=self.config.updated_model_file_path,
+                update_method=update_method,
+                incumbent_metric_artifact=incumbent_metrics,
+                updated_metric_artifact=updated_metrics,
+                is_promoted=is_promoted
+            )
+        except Exception as e:
+            logger.error("Error during incremental model update")
+            raise CustomException(e, sys)
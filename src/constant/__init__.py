@@ -10,10 +10,12 @@ RAW_DATA_PATH = os.path.join(BASE_DIR, "data", "raw", "data.csv")
 TARGET_COLUMN = "Result"
 PIPELINE_NAME: str = "autosense_pipeline"
 ARTIFACT_DIR: str = "Artifacts"
+ARTIFACT_TIMESTAMP_FORMAT: str = "%m_%d_%Y_%H_%M_%S"
 FILE_NAME: str = "data.csv"
 
 TRAIN_FILE_NAME: str = "train.csv"
 TEST_FILE_NAME: str = "test.csv"
+ARTIFACT_FILE_FORMAT: str = "parquet"
 
 SCHEMA_FILE_PATH = os.path.join("data_schema", "schema.yaml")
 
@@ -27,18 +29,46 @@ DATA_INGESTION_DIR_NAME:str="data_ingestion"
 DATA_INGESTION_FEATURE_STORE_DIR_NAME:str="feature_env"
 DATA_INGESTION_INGESTED_DIR:str="ingested"
 DATA_INGESTION_TRAIN_TEST_SPLIT_RATION:float=0.2 
+DATA_INGESTION_STREAMING:bool=True
+DATA_INGESTION_BATCH_SIZE:int=50_000
+DATA_INGESTION_INCREMENTAL:bool=True
+DATA_INGESTION_WATERMARK_FIELD:str="_id"
+DATA_INGESTION_WATERMARK_FILE_NAME:str="watermark.yaml"
+DATA_INGESTION_DELTA_TRAIN_FILE_NAME:str="delta_train.csv"
+
+DATA_UPLOAD_CHUNK_SIZE: int = 10_000
+DATA_UPLOAD_MAX_WORKERS: int = 4
+DATA_UPLOAD_MAX_IN_FLIGHT: int = 8
+DATA_UPLOAD_MAX_RETRIES: int = 3
+DATA_UPLOAD_UPSERT: bool = False
+DATA_UPLOAD_ROW_HASH_FIELD: str = "row_hash"
 
 DATA_VALIDATION_DIR_NAME: str = "data_validation"
 DATA_VALIDATION_VALID_DIR: str = "validated"
 DATA_VALIDATION_INVALID_DIR: str = "invalid"
 DATA_VALIDATION_DRIFT_REPORT_DIR: str = "drift_report"
 DATA_VALIDATION_DRIFT_REPORT_FILE_NAME: str = "report.yaml"
+DATA_VALIDATION_CHUNK_SIZE: int = 100_000
+DATA_VALIDATION_DRIFT_THRESHOLD: float = 0.05
+DATA_VALIDATION_PSI_BINS: int = 10
+DATA_VALIDATION_DRIFT_MAX_WORKERS: int = 4
+DATA_VALIDATION_REFERENCE_PROFILE_DIR: str = "reference_profile"
+DATA_VALIDATION_REFERENCE_PROFILE_FILE_NAME: str = "profile.yaml"
+DATA_VALIDATION_USE_CACHED_REFERENCE: bool = True
 PREPROCESSING_OBJECT_FILE_NAME = "preprocessing.pkl"
 
 
 DATA_TRANSFORMATION_DIR_NAME: str = "data_transformation"
 DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR: str = "transformed"
 DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR: str = "transformed_object"
+DATA_TRANSFORMATION_SPARSE_OUTPUT: bool = False
+DATA_TRANSFORMATION_TARGET_FILE_SUFFIX: str = "_target"
+DATA_TRANSFORMATION_STREAMING: bool = False
+DATA_TRANSFORMATION_CHUNK_SIZE: int = 100_000
+# Precision of transformed features ("float32" or "float64"); the preprocessor itself
+# casts to it, so training and serving see the same dtype
+DATA_TRANSFORMATION_FEATURE_DTYPE: str = "float32"
+DATA_TRANSFORMATION_METADATA_FILE_NAME: str = "metadata.yaml"
 
 
 DATA_TRANSFORMATION_IMPUTER_PARAMS: dict = {
@@ -55,5 +85,72 @@ MODEL_TRAINER_TRAINED_MODEL_DIR: str = "trained_model"
 MODEL_TRAINER_TRAINED_MODEL_NAME: str = "model.pkl"
 MODEL_TRAINER_EXPECTED_SCORE: float = 0.70
 MODEL_TRAINER_OVER_FIITING_UNDER_FITTING_THRESHOLD: float = 0.05
+# Candidates train concurrently in worker processes sharing one core budget
+MODEL_TRAINER_PARALLEL: bool = True
+MODEL_TRAINER_CORE_BUDGET: int = None  # None = all cores
+
+# Hyperparameter search: successive halving over training-row subsamples and, for
+# ensembles, the number of trees (which therefore is not part of their spaces).
+# On by default, so every training run spends up to the budget on it first
+MODEL_TRAINER_SEARCH: bool = True
+MODEL_TRAINER_SEARCH_BUDGET_SECONDS: float = 600  # CPU seconds across all trials; no trial starts past it
+MODEL_TRAINER_SEARCH_ETA: int = 3
+MODEL_TRAINER_SEARCH_MIN_RESOURCE: float = 0.1
+MODEL_TRAINER_SEARCH_N_CANDIDATES: int = 9
+MODEL_TRAINER_SEARCH_MAX_ESTIMATORS: int = 150
+MODEL_TRAINER_SEARCH_VALIDATION_FRACTION: float = 0.2
+MODEL_TRAINER_SEARCH_SPACE: dict = {
+    "RandomForest": {
+        "max_depth": [8, 12, 16, None],
+        "min_samples_leaf": [1, 2, 5],
+        "max_features": [1.0, 0.5, "sqrt"],
+    },
+    "GradientBoosting": {
+        "learning_rate": [0.05, 0.1, 0.2],
+        "max_depth": [3, 4, 6],
+        "subsample": [0.8, 1.0],
+    },
+    "HistGradientBoosting": {
+        "model__learning_rate": [0.05, 0.1, 0.2],
+        "model__max_leaf_nodes": [15, 31, 63],
+        "model__min_samples_leaf": [20, 50],
+        "model__l2_regularization": [0.0, 1.0],
+    },
+    "Lasso": {
+        "alpha": [0.0001, 0.001, 0.01, 0.1, 1.0],
+    },
+    "SGD": {
+        "alpha": [0.00001, 0.0001, 0.001],
+        "penalty": ["l2", "elasticnet"],
+    },
+}
+
+# Incremental retraining: the served model in best_model/ is updated on the newly
+# ingested rows only and replaced when it improves on the holdout split
+BEST_MODEL_DIR: str = "best_model"
+MODEL_UPDATE_DIR_NAME: str = "model_update"
+MODEL_UPDATE_MIN_NEW_TREES: int = 5
+MODEL_UPDATE_MAX_ESTIMATORS: int = 500
+MODEL_UPDATE_SGD_EPOCHS: int = 5
+MODEL_UPDATE_MIN_IMPROVEMENT: float = 0.0
+
+# New-data trigger (src/mlops/jenkins/check_new_data.py)
+NEW_DATA_FULL_RETRAIN_THRESHOLD: int = 10_000
+NEW_DATA_INCREMENTAL_THRESHOLD: int = 1_000
+
+# Batch scoring (src/pipelines/batch_prediction.py): each chunk is scored by a worker
+# process and written as its own part file, so an interrupted run resumes per chunk
+BATCH_PREDICTION_CHUNK_SIZE: int = 100_000
+BATCH_PREDICTION_MAX_WORKERS: int = None  # None = all cores
+BATCH_PREDICTION_MAX_IN_FLIGHT: int = None  # None = twice the workers
+BATCH_PREDICTION_PREDICTION_COLUMN: str = "predicted_price"
+BATCH_PREDICTION_PROGRESS_FILE_NAME: str = "_progress.yaml"
 
 TRAINING_BUCKET_NAME = "autosense_bucket"
+
+# Stage cache: stages whose inputs, config, schema and code are unchanged reuse the
+# artifact of an earlier run instead of recomputing it
+STAGE_CACHE_ENABLED: bool = True
+STAGE_CACHE_DIR_NAME: str = "stage_cache"
+STAGE_CACHE_MAX_AGE_DAYS: float = 30
+STAGE_CACHE_MAX_SIZE_BYTES: int = 20 * 1024 ** 3
@@ -4,6 +4,9 @@ from dataclasses import dataclass
 class DataIngestionArtifact:
     trained_file_path:str
     test_file_path:str
+    delta_train_file_path:str = None
+    delta_rows:int = None
+    total_rows:int = None
 
 
 @dataclass
@@ -14,6 +17,7 @@ class DataValidationArtifact:
     invalid_train_file_path:str
     invalid_test_file_path:str
     drift_report_file_path:str
+    reference_profile_file_path:str = None
 
 
 @dataclass
@@ -22,6 +26,10 @@ class DataTransformationArtifact:
     transformed_train_file_path: str
     transformed_test_file_path: str
     scaler_object_file_path: str 
+    transformed_train_target_file_path: str = None
+    transformed_test_target_file_path: str = None
+    is_sparse: bool = False
+    feature_dtype: str = "float64"
 
 @dataclass
 class RegressionMetricArtifact:
@@ -34,4 +42,31 @@ class RegressionMetricArtifact:
 class ModelTrainerArtifact:
     trained_model_file_path: str
     train_metric_artifact: RegressionMetricArtifact
-    test_metric_artifact: RegressionMetricArtifact
\ No newline at end of file
+    test_metric_artifact: RegressionMetricArtifact
+
+
+@dataclass
+class ModelUpdateArtifact:
+    updated_model_file_path: str
+    update_method: str
+    incumbent_metric_artifact: RegressionMetricArtifact
+    updated_metric_artifact: RegressionMetricArtifact
+    is_promoted: bool
+
+
+@dataclass
+class ModelPromotionArtifact:
+    model_file_path: str
+    incumbent_metric_artifact: RegressionMetricArtifact
+    candidate_metric_artifact: RegressionMetricArtifact
+    is_promoted: bool
+
+
+@dataclass
+class BatchPredictionArtifact:
+    output_dir: str
+    rows: int
+    chunks: int
+    resumed_chunks: int
+    seconds: float
+    rows_per_second: float
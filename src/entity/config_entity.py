@@ -4,7 +4,7 @@ from src import constant
 
 class TrainingPipelineConfig:
     def __init__ (self,timestamp=datetime.now()):
-        timestamp=timestamp.strftime("%m_%d_%Y_%H_%M_%S")
+        timestamp=timestamp.strftime(constant.ARTIFACT_TIMESTAMP_FORMAT)
         self.pipeline_name=constant.PIPELINE_NAME
         self.artifact_name=constant.ARTIFACT_DIR
         self.artifact_dir=os.path.join(self.artifact_name,timestamp)
@@ -19,17 +19,34 @@ class DataIngestionConfig:
             training_pipeline_config.artifact_dir,constant.DATA_INGESTION_DIR_NAME
         )
         self.feature_store_file_path: str = os.path.join(
-                self.data_ingestion_dir, constant.DATA_INGESTION_FEATURE_STORE_DIR_NAME, constant.FILE_NAME
+                self.data_ingestion_dir, constant.DATA_INGESTION_FEATURE_STORE_DIR_NAME,
+                constant.FILE_NAME.replace("csv", constant.ARTIFACT_FILE_FORMAT)
             )
         self.training_file_path: str = os.path.join(
-                self.data_ingestion_dir, constant.DATA_INGESTION_INGESTED_DIR, constant.TRAIN_FILE_NAME
+                self.data_ingestion_dir, constant.DATA_INGESTION_INGESTED_DIR,
+                constant.TRAIN_FILE_NAME.replace("csv", constant.ARTIFACT_FILE_FORMAT)
             )
         self.testing_file_path: str = os.path.join(
-                self.data_ingestion_dir, constant.DATA_INGESTION_INGESTED_DIR, constant.TEST_FILE_NAME
+                self.data_ingestion_dir, constant.DATA_INGESTION_INGESTED_DIR,
+                constant.TEST_FILE_NAME.replace("csv", constant.ARTIFACT_FILE_FORMAT)
             )
         self.train_test_split_ratio: float = constant.DATA_INGESTION_TRAIN_TEST_SPLIT_RATION
         self.collection_name: str = constant.DATA_INGESTION_COLLECTION_NAME
         self.database_name: str = constant.DATA_INGESTION_DATABASE_NAME
+        self.streaming: bool = constant.DATA_INGESTION_STREAMING
+        self.batch_size: int = constant.DATA_INGESTION_BATCH_SIZE
+        self.incremental: bool = constant.DATA_INGESTION_INCREMENTAL
+        self.watermark_field: str = constant.DATA_INGESTION_WATERMARK_FIELD
+        self.watermark_file_path: str = os.path.join(
+                self.data_ingestion_dir, constant.DATA_INGESTION_FEATURE_STORE_DIR_NAME, constant.DATA_INGESTION_WATERMARK_FILE_NAME
+            )
+        # Training rows added by this run alone, for incremental model updates
+        self.delta_training_file_path: str = os.path.join(
+                self.data_ingestion_dir, constant.DATA_INGESTION_INGESTED_DIR,
+                constant.DATA_INGESTION_DELTA_TRAIN_FILE_NAME.replace("csv", constant.ARTIFACT_FILE_FORMAT)
+            )
+        self.artifact_dir: str = training_pipeline_config.artifact_dir
+        self.artifact_root: str = training_pipeline_config.artifact_name
 
 
 class DataValidationConfig:
@@ -37,15 +54,27 @@ class DataValidationConfig:
         self.data_validation_dir: str = os.path.join( training_pipeline_config.artifact_dir, constant.DATA_VALIDATION_DIR_NAME)
         self.valid_data_dir: str = os.path.join(self.data_validation_dir, constant.DATA_VALIDATION_VALID_DIR)
         self.invalid_data_dir: str = os.path.join(self.data_validation_dir, constant.DATA_VALIDATION_INVALID_DIR)
-        self.valid_train_file_path: str = os.path.join(self.valid_data_dir, constant.TRAIN_FILE_NAME)
-        self.valid_test_file_path: str = os.path.join(self.valid_data_dir, constant.TEST_FILE_NAME)
-        self.invalid_train_file_path: str = os.path.join(self.invalid_data_dir, constant.TRAIN_FILE_NAME)
-        self.invalid_test_file_path: str = os.path.join(self.invalid_data_dir, constant.TEST_FILE_NAME)
+        self.valid_train_file_path: str = os.path.join(self.valid_data_dir, constant.TRAIN_FILE_NAME.replace("csv", constant.ARTIFACT_FILE_FORMAT))
+        self.valid_test_file_path: str = os.path.join(self.valid_data_dir, constant.TEST_FILE_NAME.replace("csv", constant.ARTIFACT_FILE_FORMAT))
+        self.invalid_train_file_path: str = os.path.join(self.invalid_data_dir, constant.TRAIN_FILE_NAME.replace("csv", constant.ARTIFACT_FILE_FORMAT))
+        self.invalid_test_file_path: str = os.path.join(self.invalid_data_dir, constant.TEST_FILE_NAME.replace("csv", constant.ARTIFACT_FILE_FORMAT))
         self.drift_report_file_path: str = os.path.join(
             self.data_validation_dir,
             constant.DATA_VALIDATION_DRIFT_REPORT_DIR,
             constant.DATA_VALIDATION_DRIFT_REPORT_FILE_NAME,
         )
+        self.chunk_size: int = constant.DATA_VALIDATION_CHUNK_SIZE
+        self.drift_threshold: float = constant.DATA_VALIDATION_DRIFT_THRESHOLD
+        self.psi_bins: int = constant.DATA_VALIDATION_PSI_BINS
+        self.drift_max_workers: int = constant.DATA_VALIDATION_DRIFT_MAX_WORKERS
+        self.reference_profile_file_path: str = os.path.join(
+            self.data_validation_dir,
+            constant.DATA_VALIDATION_REFERENCE_PROFILE_DIR,
+            constant.DATA_VALIDATION_REFERENCE_PROFILE_FILE_NAME,
+        )
+        self.use_cached_reference: bool = constant.DATA_VALIDATION_USE_CACHED_REFERENCE
+        self.artifact_dir: str = training_pipeline_config.artifact_dir
+        self.artifact_root: str = training_pipeline_config.artifact_name
 
 
 class DataTransformationConfig:
@@ -57,6 +86,18 @@ class DataTransformationConfig:
             constant.TEST_FILE_NAME.replace("csv", "npy"), )
         self.transformed_object_file_path: str = os.path.join( self.data_transformation_dir, constant.DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
             constant.PREPROCESSING_OBJECT_FILE_NAME,)
+        self.transformed_train_target_file_path: str = os.path.join(self.data_transformation_dir, constant.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
+            constant.TRAIN_FILE_NAME.replace(".csv", constant.DATA_TRANSFORMATION_TARGET_FILE_SUFFIX + ".npy"),)
+        self.transformed_test_target_file_path: str = os.path.join(self.data_transformation_dir, constant.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
+            constant.TEST_FILE_NAME.replace(".csv", constant.DATA_TRANSFORMATION_TARGET_FILE_SUFFIX + ".npy"),)
+        # Sparse mode keeps the one-hot CSR matrix and stores features (.npz) and target (.npy) separately
+        self.sparse_output: bool = constant.DATA_TRANSFORMATION_SPARSE_OUTPUT
+        # Streaming mode fits in one chunked pass and transforms into preallocated memmaps
+        self.streaming: bool = constant.DATA_TRANSFORMATION_STREAMING
+        self.chunk_size: int = constant.DATA_TRANSFORMATION_CHUNK_SIZE
+        self.feature_dtype: str = constant.DATA_TRANSFORMATION_FEATURE_DTYPE
+        self.metadata_file_path: str = os.path.join(self.data_transformation_dir, constant.DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
+            constant.DATA_TRANSFORMATION_METADATA_FILE_NAME,)
 
 class ModelTrainerConfig:
     def __init__(self,training_pipeline_config:TrainingPipelineConfig):
@@ -69,11 +110,65 @@ class ModelTrainerConfig:
         )
         self.expected_accuracy: float = constant.MODEL_TRAINER_EXPECTED_SCORE
         self.overfitting_underfitting_threshold = constant.MODEL_TRAINER_OVER_FIITING_UNDER_FITTING_THRESHOLD
+        self.parallel: bool = constant.MODEL_TRAINER_PARALLEL
+        self.core_budget: int = constant.MODEL_TRAINER_CORE_BUDGET
+        self.search: bool = constant.MODEL_TRAINER_SEARCH
+        self.search_budget_seconds: float = constant.MODEL_TRAINER_SEARCH_BUDGET_SECONDS
+        self.search_eta: int = constant.MODEL_TRAINER_SEARCH_ETA
+        self.search_min_resource: float = constant.MODEL_TRAINER_SEARCH_MIN_RESOURCE
+        self.search_n_candidates: int = constant.MODEL_TRAINER_SEARCH_N_CANDIDATES
+        self.search_max_estimators: int = constant.MODEL_TRAINER_SEARCH_MAX_ESTIMATORS
+        self.search_validation_fraction: float = constant.MODEL_TRAINER_SEARCH_VALIDATION_FRACTION
+        self.search_space: dict = constant.MODEL_TRAINER_SEARCH_SPACE
+
+
+class ModelUpdateConfig:
+    def __init__(self,training_pipeline_config:TrainingPipelineConfig):
+        self.model_update_dir: str = os.path.join(training_pipeline_config.artifact_dir, constant.MODEL_UPDATE_DIR_NAME)
+        self.updated_model_file_path: str = os.path.join(self.model_update_dir, constant.MODEL_FILE_NAME)
+        self.best_model_file_path: str = os.path.join(constant.BEST_MODEL_DIR, constant.MODEL_FILE_NAME)
+        self.best_preprocessing_object_file_path: str = os.path.join(
+            constant.BEST_MODEL_DIR, constant.DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR, constant.PREPROCESSING_OBJECT_FILE_NAME
+        )
+        self.min_new_trees: int = constant.MODEL_UPDATE_MIN_NEW_TREES
+        self.max_estimators: int = constant.MODEL_UPDATE_MAX_ESTIMATORS
+        self.sgd_epochs: int = constant.MODEL_UPDATE_SGD_EPOCHS
+        self.min_improvement: float = constant.MODEL_UPDATE_MIN_IMPROVEMENT
+
+
+class StageCacheConfig:
+    def __init__(self,training_pipeline_config:TrainingPipelineConfig):
+        self.enabled: bool = constant.STAGE_CACHE_ENABLED
+        self.cache_dir: str = os.path.join(training_pipeline_config.artifact_name, constant.STAGE_CACHE_DIR_NAME)
+        self.max_age_days: float = constant.STAGE_CACHE_MAX_AGE_DAYS
+        self.max_size_bytes: int = constant.STAGE_CACHE_MAX_SIZE_BYTES
+        self.schema_file_path: str = constant.SCHEMA_FILE_PATH
+
+
+class BatchPredictionConfig:
+    def __init__(self):
+        self.model_file_path: str = os.path.join(constant.BEST_MODEL_DIR, constant.MODEL_FILE_NAME)
+        self.preprocessing_object_file_path: str = os.path.join(
+            constant.BEST_MODEL_DIR, constant.DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR, constant.PREPROCESSING_OBJECT_FILE_NAME
+        )
+        self.database_name: str = constant.DATA_INGESTION_DATABASE_NAME
+        self.collection_name: str = constant.DATA_INGESTION_COLLECTION_NAME
+        self.chunk_size: int = constant.BATCH_PREDICTION_CHUNK_SIZE
+        self.max_workers: int = constant.BATCH_PREDICTION_MAX_WORKERS
+        self.max_in_flight: int = constant.BATCH_PREDICTION_MAX_IN_FLIGHT
+        self.prediction_column: str = constant.BATCH_PREDICTION_PREDICTION_COLUMN
+        self.progress_file_name: str = constant.BATCH_PREDICTION_PROGRESS_FILE_NAME
+        self.output_format: str = constant.ARTIFACT_FILE_FORMAT
 
 
 class DataUploadConfig:
     def __init__(self):
         self.raw_data_path =constant.RAW_DATA_PATH
-        self.mongo_uri = os.getenv("MONGODB_URL")
         self.database_name = constant.DATA_INGESTION_DATABASE_NAME
         self.collection_name = constant.DATA_INGESTION_COLLECTION_NAME
+        self.chunk_size = constant.DATA_UPLOAD_CHUNK_SIZE
+        self.max_workers = constant.DATA_UPLOAD_MAX_WORKERS
+        self.max_in_flight = constant.DATA_UPLOAD_MAX_IN_FLIGHT
+        self.max_retries = constant.DATA_UPLOAD_MAX_RETRIES
+        self.upsert = constant.DATA_UPLOAD_UPSERT
+        self.row_hash_field = constant.DATA_UPLOAD_ROW_HASH_FIELD
@@ -0,0 +1,63 @@
+"""Save the promoted model into the BentoML model store for ``service.py``.
+
+::
+
+    python -m src.mlops.bentoml.model_store            # best_model/ -> car_price_model:<version>
+
+The fitted preprocessor is stored with the model as a custom object, so one
+store version always holds a matching pair. Saving files that are already in
+the store (same checksum label) returns the existing version.
+"""
+import argparse
+import os
+import pickle
+import sys
+import bentoml
+import joblib
+
+from src.constant import BEST_MODEL_DIR, DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR, MODEL_FILE_NAME, PREPROCESSING_OBJECT_FILE_NAME
+from src.serving.model_holder import files_checksum
+from src.utils.exception import CustomException
+from src.utils.log_config import logger
+
+BENTO_MODEL_NAME = os.getenv("BENTO_MODEL_NAME", "car_price_model")
+
+
+def save_to_model_store(model_file_path: str, preprocessing_object_file_path: str,
+                        name: str = BENTO_MODEL_NAME) -> bentoml.Model:
+    try:
+        checksum = files_checksum([model_file_path, preprocessing_object_file_path])
+        for existing in bentoml.models.list():
+            if existing.tag.name == name and existing.info.labels.get("checksum") == checksum:
+                logger.info(f"Model files already in the store as {existing.tag}")
+                return existing
+
+        with open(preprocessing_object_file_path, "rb") as f:
+            preprocessor = pickle.load(f)
+        model = joblib.load(model_file_path)
+        bento_model = bentoml.sklearn.save_model(
+            name,
+            model,
+            signatures={"predict": {"batchable": True, "batch_dim": 0}},
+            labels={"checksum": checksum},
+            custom_objects={"preprocessor": preprocessor},
+            metadata={"feature_columns": list(preprocessor.feature_names_in_), "model_type": type(model).__name__},
+        )
+        logger.info(f"Saved {model_file_path} to the BentoML model store as {bento_model.tag}")
+        return bento_model
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Save the promoted model into the BentoML model store")
+    parser.add_argument("--model", default=os.path.join(BEST_MODEL_DIR, MODEL_FILE_NAME))
+    parser.add_argument("--preprocessor", default=os.path.join(
+        BEST_MODEL_DIR, DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR, PREPROCESSING_OBJECT_FILE_NAME))
+    parser.add_argument("--name", default=BENTO_MODEL_NAME)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    save_to_model_store(args.model, args.preprocessor, args.name)
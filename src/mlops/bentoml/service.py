@@ -1,38 +1,83 @@
+"""BentoML service for car price prediction (BentoML 1.2+).
+
+Save the promoted model into the model store, then serve::
+
+    python -m src.mlops.bentoml.model_store
+    bentoml serve src.mlops.bentoml.service:CarPriceService
+
+``CarPriceModel`` holds the model and runs in its own worker processes;
+its ``predict`` is batchable, so BentoML's adaptive batcher merges the cars of
+concurrent requests into one vectorized transform+predict call of at most
+``BENTO_MAX_BATCH_SIZE`` rows. ``CarPriceService`` is the HTTP API, which only
+validates and forwards. The two scale independently (``BENTO_MODEL_WORKERS``,
+``BENTO_API_WORKERS``). A new model is served by saving it to the store and
+restarting (or rebuilding the Bento), which loads ``BENTO_MODEL_NAME:latest``.
+"""
 from __future__ import annotations
 import os
-import pandas as pd
-import pickle
-import joblib
+import sys
+from typing import Annotated
 import bentoml
-from bentoml.io import JSON
+from pydantic import BaseModel, ConfigDict, Field
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
-PREPROCESSOR_PATH = os.path.join(BASE_DIR, "best_model", "transformed_object", "preprocessing.pkl")
-MODEL_PATH = os.path.join(BASE_DIR, "best_model", "model.pkl")
+sys.path.append(BASE_DIR)
+
+from src.mlops.bentoml.model_store import BENTO_MODEL_NAME
+from src.serving.model_holder import prepare_bundle
+from src.utils.log_config import logger
+
+# Rows per batched model call; BentoML sizes batches adaptively up to this
+BENTO_MAX_BATCH_SIZE = int(os.getenv("BENTO_MAX_BATCH_SIZE", 64))
+# Batched calls that cannot be answered within this many ms are rejected (503) instead of queueing
+BENTO_MAX_LATENCY_MS = int(os.getenv("BENTO_MAX_LATENCY_MS", 1000))
+BENTO_MODEL_WORKERS = int(os.getenv("BENTO_MODEL_WORKERS", 1))
+BENTO_API_WORKERS = int(os.getenv("BENTO_API_WORKERS", 1))
+# Largest number of cars accepted by one predict_batch request
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 1000))
+
 
-FEATURE_COLUMNS = [
-    "transmission",
-    "fuel_type",
-    "drivetrain",
-    "body_type",
-    "make",
-    "mileage",
-    "engine_hp",
-    "vehicle_age"
-]
+class Car(BaseModel):
+    model_config = ConfigDict(extra="forbid", allow_inf_nan=False)
 
-with open(PREPROCESSOR_PATH, "rb") as f:
-    preprocessor = pickle.load(f)
+    transmission: str
+    fuel_type: str
+    drivetrain: str
+    body_type: str
+    make: str
+    mileage: float
+    engine_hp: float
+    vehicle_age: float
 
-model = joblib.load(MODEL_PATH)
 
+@bentoml.service(workers=BENTO_MODEL_WORKERS, resources={"cpu": "1"})
+class CarPriceModel:
+    bento_model = bentoml.models.get(f"{BENTO_MODEL_NAME}:latest")
 
-@bentoml.Service()
+    def __init__(self):
+        # Loaded, compiled and warmed up before the worker takes traffic
+        self.bundle = prepare_bundle(
+            self.bento_model.custom_objects["preprocessor"],
+            bentoml.sklearn.load_model(self.bento_model),
+            str(self.bento_model.tag.version),
+        )
+        logger.info(f"Serving {self.bento_model.tag}")
+
+    @bentoml.api(batchable=True, batch_dim=0, max_batch_size=BENTO_MAX_BATCH_SIZE, max_latency_ms=BENTO_MAX_LATENCY_MS)
+    def predict(self, cars: list[dict]) -> list[float]:
+        return self.bundle.predict(cars).tolist()
+
+
+@bentoml.service(workers=BENTO_API_WORKERS)
 class CarPriceService:
+    model = bentoml.depends(CarPriceModel)
 
     @bentoml.api
-    def predict(self, input_data):
-        df = pd.DataFrame([input_data], columns=FEATURE_COLUMNS)
-        transformed = preprocessor.transform(df)
-        prediction = model.predict(transformed)[0]
+    async def predict(self, input_data: Car) -> dict:
+        prediction = (await self.model.to_async.predict([input_data.model_dump()]))[0]
         return {"prediction": round(prediction, 2)}
+
+    @bentoml.api
+    async def predict_batch(self, cars: Annotated[list[Car], Field(min_length=1, max_length=MAX_BATCH_SIZE)]) -> dict:
+        predictions = await self.model.to_async.predict([car.model_dump() for car in cars])
+        return {"predictions": [round(prediction, 2) for prediction in predictions]}
@@ -1,41 +1,59 @@
-import pymongo
 import os
 from dotenv import load_dotenv
 
+from src.constant import (
+    DATA_INGESTION_DATABASE_NAME,
+    DATA_INGESTION_COLLECTION_NAME,
+    NEW_DATA_FULL_RETRAIN_THRESHOLD,
+    NEW_DATA_INCREMENTAL_THRESHOLD,
+)
+from src.utils.mongo_connection import get_collection
+
 load_dotenv()
 
-MONGO_URI = os.getenv("MONGODB_URI")
-DB_NAME = os.getenv("MONGO_DB_NAME")
-COLLECTION_NAME = os.getenv("MONGO_COLLECTION")
+DB_NAME = os.getenv("MONGO_DB_NAME", DATA_INGESTION_DATABASE_NAME)
+COLLECTION_NAME = os.getenv("MONGO_COLLECTION", DATA_INGESTION_COLLECTION_NAME)
+FULL_RETRAIN_THRESHOLD = int(os.getenv("FULL_RETRAIN_THRESHOLD", NEW_DATA_FULL_RETRAIN_THRESHOLD))
+INCREMENTAL_THRESHOLD = int(os.getenv("INCREMENTAL_THRESHOLD", NEW_DATA_INCREMENTAL_THRESHOLD))
 
 TRACK_FILE = "last_count.txt"
+FULL_TRACK_FILE = "last_full_count.txt"
+
+# Exit codes read by the Jenkinsfile
+FULL_RETRAIN = 0
+SKIP = 1
+INCREMENTAL = 2
 
 def get_current_count():
-    client = pymongo.MongoClient(MONGO_URI)
-    db = client[DB_NAME]
-    collection = db[COLLECTION_NAME]
+    collection = get_collection(DB_NAME, COLLECTION_NAME)
     return collection.count_documents({})
 
-def get_previous_count():
-    if os.path.exists(TRACK_FILE):
-        with open(TRACK_FILE, "r") as f:
+def get_previous_count(track_file=TRACK_FILE):
+    if os.path.exists(track_file):
+        with open(track_file, "r") as f:
             return int(f.read().strip())
     return 0
 
-def update_count(count):
-    with open(TRACK_FILE, "w") as f:
+def update_count(count, track_file=TRACK_FILE):
+    with open(track_file, "w") as f:
         f.write(str(count))
 
 if __name__ == "__main__":
     current_count = get_current_count()
     previous_count = get_previous_count()
-    temp_count=current_count-previous_count
-    print(f"Previous count: {previous_count}, Current count: {current_count}")
+    # Rows absorbed by incremental updates still count towards the next full retrain
+    full_count = get_previous_count(FULL_TRACK_FILE) if os.path.exists(FULL_TRACK_FILE) else previous_count
+    print(f"Previous count: {previous_count}, Last full retrain count: {full_count}, Current count: {current_count}")
 
-    if temp_count>10000:
-        print(" New data detected! Updating record...")
+    if current_count - full_count > FULL_RETRAIN_THRESHOLD:
+        print(" Enough new data for a full retrain. Updating record...")
+        update_count(current_count)
+        update_count(current_count, FULL_TRACK_FILE)
+        exit(FULL_RETRAIN)  # Jenkins runs the full pipeline
+    elif current_count - previous_count > INCREMENTAL_THRESHOLD:
+        print(" New data detected! Updating the served model incrementally...")
         update_count(current_count)
-        exit(0)  # Jenkins proceeds
+        exit(INCREMENTAL)  # Jenkins runs main.py --incremental
     else:
         print(" No new data found. Skipping pipeline.")
-        exit(1)  # Jenkins stops here
+        exit(SKIP)  # Jenkins stops here
@@ -0,0 +1,257 @@
+import argparse
+import glob
+import json
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+import joblib
+import numpy as np
+import pandas as pd
+from bson import ObjectId
+from threadpoolctl import threadpool_limits
+
+from src.entity.artifact_entity import BatchPredictionArtifact
+from src.entity.config_entity import BatchPredictionConfig
+from src.utils.exception import CustomException
+from src.utils.log_config import logger
+from src.utils.main_utils import iter_table_chunks, read_yaml_file, write_table, write_yaml_file
+from src.utils.mongo_connection import get_collection
+from src.utils.stage_cache import hash_file
+
+CATEGORICAL_COLUMNS = ["make", "transmission", "fuel_type", "drivetrain", "body_type"]
+NUMERIC_COLUMNS = ["mileage", "engine_hp", "vehicle_age"]
+FEATURE_COLUMNS = CATEGORICAL_COLUMNS + NUMERIC_COLUMNS
+
+# Loaded once per worker process by _init_worker
+_preprocessor = None
+_model = None
+
+
+def _init_worker(preprocessing_object_file_path: str, model_file_path: str) -> None:
+    global _preprocessor, _model
+    with open(preprocessing_object_file_path, "rb") as f:
+        _preprocessor = pickle.load(f)
+    _model = joblib.load(model_file_path)
+    # Parallelism comes from the worker processes; one thread each avoids oversubscription
+    for step in (_model.steps if hasattr(_model, "steps") else [(None, _model)]):
+        if "n_jobs" in step[1].get_params():
+            step[1].set_params(n_jobs=1)
+    threadpool_limits(limits=1)
+
+
+def prepare_features(df: pd.DataFrame):
+    """Return ``(X, valid)``: the feature frame typed as in training, and rows with every numeric present."""
+    X = df.reindex(columns=FEATURE_COLUMNS).replace({"na": np.nan})
+    for col in NUMERIC_COLUMNS:
+        X[col] = pd.to_numeric(X[col], errors="coerce")
+    for col in CATEGORICAL_COLUMNS:
+        X[col] = X[col].astype("category")
+    return X, X[NUMERIC_COLUMNS].notna().all(axis=1).to_numpy()
+
+
+def score_chunk(chunk_id: int, df: pd.DataFrame, part_file_path: str, prediction_column: str):
+    """Score one chunk and write it with its predictions; runs inside a worker process.
+
+    Rows with a missing or non-numeric numeric feature get a NaN prediction
+    instead of failing the chunk. The part file appears atomically, so a part
+    on disk is always complete.
+    """
+    X, valid = prepare_features(df)
+    predictions = np.full(len(df), np.nan)
+    if valid.any():
+        predictions[valid] = _model.predict(_preprocessor.transform(X[valid]))
+    df[prediction_column] = predictions
+
+    directory, name = os.path.split(part_file_path)
+    tmp_file_path = os.path.join(directory, f".{name}")
+    write_table(df, tmp_file_path)
+    os.replace(tmp_file_path, part_file_path)
+    return chunk_id, len(df), int((~valid).sum())
+
+
+class BatchPrediction:
+    """Score a CSV/Parquet file or a MongoDB query with the model in ``best_model/``.
+
+    Input is streamed in chunks of ``chunk_size`` rows; each chunk is scored by
+    a worker process (which loads the preprocessor and model once) and written
+    to ``part-<chunk>.<format>`` in the output directory. At most
+    ``max_in_flight`` chunks are queued, so memory stays bounded however large
+    the input is. Completed chunks are recorded in ``_progress.yaml``; a rerun
+    against the same input, chunk size and model skips them, and for MongoDB
+    sources resumes the cursor after the last contiguous completed chunk.
+    """
+
+    def __init__(self, batch_prediction_config: BatchPredictionConfig = None):
+        self.config = batch_prediction_config or BatchPredictionConfig()
+
+    def part_file_path(self, output_dir: str, chunk_id: int) -> str:
+        return os.path.join(output_dir, f"part-{chunk_id:05d}.{self.config.output_format}")
+
+    def iter_file_chunks(self, input_file_path: str):
+        yield from enumerate(iter_table_chunks(input_file_path, chunk_size=self.config.chunk_size))
+
+    def iter_mongo_chunks(self, query: dict = None, after_id: str = None, first_chunk_id: int = 0):
+        """Yield ``(chunk_id, DataFrame)`` in ``_id`` order, starting after ``after_id``."""
+        collection = get_collection(self.config.database_name, self.config.collection_name)
+        query = query or {}
+        if after_id is not None:
+            query = {"$and": [query, {"_id": {"$gt": ObjectId(after_id)}}]}
+        projection = {col: 1 for col in FEATURE_COLUMNS}
+        cursor = collection.find(query, projection=projection, batch_size=self.config.chunk_size).sort("_id", 1)
+        for chunk_id in range(first_chunk_id, sys.maxsize):
+            documents = list(islice(cursor, self.config.chunk_size))
+            if not documents:
+                break
+            df = pd.DataFrame.from_records(documents)
+            df["_id"] = df["_id"].astype(str)
+            yield chunk_id, df
+
+    def fingerprint(self, input_file_path: str = None, query: dict = None) -> dict:
+        """What a previous run must match for its completed chunks to be reused."""
+        source = (
+            {"file": os.path.abspath(input_file_path), "size": os.path.getsize(input_file_path),
+             "mtime": os.path.getmtime(input_file_path)}
+            if input_file_path else
+            {"mongo": f"{self.config.database_name}.{self.config.collection_name}",
+             "query": json.dumps(query or {}, sort_keys=True, default=str)}
+        )
+        return {
+            "source": source,
+            "chunk_size": self.config.chunk_size,
+            "model": hash_file(self.config.model_file_path),
+            "preprocessor": hash_file(self.config.preprocessing_object_file_path),
+        }
+
+    def load_progress(self, output_dir: str, fingerprint: dict, resume: bool) -> dict:
+        """Return completed chunks ``{chunk_id: {"rows", "last_id"}}`` reusable from an earlier run."""
+        progress_file_path = os.path.join(output_dir, self.config.progress_file_name)
+        if resume and os.path.exists(progress_file_path):
+            progress = read_yaml_file(progress_file_path) or {}
+            if progress.get("fingerprint") == fingerprint:
+                completed = progress.get("completed") or {}
+                return {
+                    chunk_id: chunk for chunk_id, chunk in completed.items()
+                    if os.path.exists(self.part_file_path(output_dir, chunk_id))
+                }
+            logger.info("Input, chunk size or model changed since the last run; starting over")
+        for file_path in glob.glob(os.path.join(output_dir, "part-*")):
+            os.remove(file_path)
+        return {}
+
+    def save_progress(self, output_dir: str, fingerprint: dict, completed: dict) -> None:
+        progress_file_path = os.path.join(output_dir, self.config.progress_file_name)
+        tmp_file_path = progress_file_path + ".tmp"
+        write_yaml_file(tmp_file_path, {"fingerprint": fingerprint, "completed": completed})
+        os.replace(tmp_file_path, progress_file_path)
+
+    @staticmethod
+    def contiguous_prefix(completed: dict) -> int:
+        """Number of chunks completed without gaps from chunk 0."""
+        n = 0
+        while n in completed:
+            n += 1
+        return n
+
+    def predict(self, output_dir: str, input_file_path: str = None, query: dict = None,
+                resume: bool = True) -> BatchPredictionArtifact:
+        """Score ``input_file_path`` (CSV/Parquet) or, when it is None, the documents matching ``query``."""
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            fingerprint = self.fingerprint(input_file_path, query)
+            completed = self.load_progress(output_dir, fingerprint, resume)
+            if completed:
+                logger.info(f"Resuming: {len(completed)} chunks already scored")
+
+            if input_file_path:
+                chunks = self.iter_file_chunks(input_file_path)
+            else:
+                # Only the documents after the last gap-free completed chunk are fetched again
+                prefix = self.contiguous_prefix(completed)
+                after_id = completed[prefix - 1]["last_id"] if prefix else None
+                chunks = self.iter_mongo_chunks(query, after_id=after_id, first_chunk_id=prefix)
+
+            max_workers = self.config.max_workers or os.cpu_count() or 1
+            max_in_flight = self.config.max_in_flight or 2 * max_workers
+            start = time.perf_counter()
+            rows, invalid_rows, chunks_scored = 0, 0, 0
+            in_flight = {}
+
+            def collect(done):
+                nonlocal rows, invalid_rows, chunks_scored
+                for future in done:
+                    chunk_id, chunk_rows, chunk_invalid = future.result()
+                    completed[chunk_id] = {"rows": chunk_rows, "last_id": in_flight.pop(future)}
+                    rows += chunk_rows
+                    invalid_rows += chunk_invalid
+                    chunks_scored += 1
+                self.save_progress(output_dir, fingerprint, completed)
+                elapsed = time.perf_counter() - start
+                logger.info(f"Scored {rows} rows in {chunks_scored} chunks ({rows / max(elapsed, 1e-9):.0f} rows/sec)")
+
+            logger.info(f"Batch prediction with {max_workers} workers, chunks of {self.config.chunk_size} rows")
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_worker,
+                initargs=(self.config.preprocessing_object_file_path, self.config.model_file_path),
+            ) as executor:
+                for chunk_id, chunk in chunks:
+                    if chunk_id in completed:
+                        continue
+                    future = executor.submit(
+                        score_chunk, chunk_id, chunk, self.part_file_path(output_dir, chunk_id),
+                        self.config.prediction_column
+                    )
+                    in_flight[future] = chunk["_id"].iloc[-1] if "_id" in chunk.columns else None
+                    # Bound memory: stop reading until a chunk slot frees up
+                    if len(in_flight) >= max_in_flight:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done)
+                if in_flight:
+                    collect(wait(in_flight)[0])
+
+            elapsed = time.perf_counter() - start
+            artifact = BatchPredictionArtifact(
+                output_dir=output_dir,
+                rows=rows,
+                chunks=chunks_scored,
+                resumed_chunks=len(completed) - chunks_scored,
+                seconds=elapsed,
+                rows_per_second=rows / max(elapsed, 1e-9),
+            )
+            if invalid_rows:
+                logger.warning(f"{invalid_rows} rows had missing numeric features and were not scored")
+            logger.info(
+                f"Batch prediction finished: {rows} rows in {elapsed:.1f}s "
+                f"({artifact.rows_per_second:.0f} rows/sec), {artifact.resumed_chunks} chunks reused"
+            )
+            return artifact
+        except Exception as e:
+            logger.error("Error during batch prediction")
+            raise CustomException(e, sys)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Score listings in bulk with the model in best_model/")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="CSV or Parquet file to score")
+    source.add_argument("--mongo-query", type=json.loads, help="JSON filter over the listings collection, e.g. '{}'")
+    parser.add_argument("--output", required=True, help="directory for part files and _progress.yaml")
+    parser.add_argument("--chunk-size", type=int, help="rows per chunk")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--no-resume", action="store_true", help="discard the progress of an earlier run")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    config = BatchPredictionConfig()
+    if args.chunk_size:
+        config.chunk_size = args.chunk_size
+    if args.workers:
+        config.max_workers = args.workers
+    print(BatchPrediction(config).predict(
+        args.output, input_file_path=args.input, query=args.mongo_query, resume=not args.no_resume
+    ))
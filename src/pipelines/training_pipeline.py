@@ -0,0 +1,261 @@
+import os
+import sys
+
+from src.components.data_ingestion import DataIngestion
+from src.components.data_validation import DataValidation
+from src.components.data_transformation import DataTransformation
+from src.components.model_training import ModelTrainer
+from src.components.model_update import ModelPromoter, ModelUpdater
+from src.entity.artifact_entity import (
+    DataIngestionArtifact,
+    DataValidationArtifact,
+    DataTransformationArtifact,
+    ModelTrainerArtifact,
+    ModelPromotionArtifact,
+    ModelUpdateArtifact,
+)
+from src.entity.config_entity import (
+    TrainingPipelineConfig,
+    DataIngestionConfig,
+    DataValidationConfig,
+    DataTransformationConfig,
+    ModelTrainerConfig,
+    ModelUpdateConfig,
+    StageCacheConfig,
+)
+from src.utils.exception import CustomException
+from src.utils.log_config import logger
+from src.utils.stage_cache import StageCache, config_fingerprint, hash_file, hash_source
+
+STAGES = ["ingestion", "validation", "transformation", "training"]
+
+
+class TrainingPipeline:
+    """Runs the four training stages, reusing cached artifacts where inputs are unchanged.
+
+    A stage's fingerprint covers the content of the files it reads, its config
+    (without run-specific paths), the schema and reference profile where
+    relevant, and the source of its component and the ``src`` modules it
+    imports, so a config change only re-runs that stage and the ones whose
+    inputs change as a result. Stages listed in ``force_stages`` always run.
+    """
+
+    def __init__(self, training_pipeline_config: TrainingPipelineConfig = None, force_stages: list = None):
+        self.training_pipeline_config = training_pipeline_config or TrainingPipelineConfig()
+        self.force_stages = set(force_stages or [])
+        self.cache_config = StageCacheConfig(self.training_pipeline_config)
+        self.stage_cache = StageCache(
+            self.cache_config.cache_dir,
+            max_age_days=self.cache_config.max_age_days,
+            max_size_bytes=self.cache_config.max_size_bytes,
+        )
+        self.used_cache_entries = set()
+        self.cache_hits = set()
+
+    def _run_stage(self, stage: str, fingerprint_parts: list, artifact_class, output_dir: str, run):
+        if not self.cache_config.enabled:
+            return run()
+        fingerprint = StageCache.fingerprint(stage, *fingerprint_parts)
+        self.used_cache_entries.add((stage, fingerprint))
+        if stage not in self.force_stages:
+            artifact = self.stage_cache.get(stage, fingerprint, artifact_class)
+            if artifact is not None:
+                logger.info(f"Stage {stage} unchanged (fingerprint {fingerprint[:12]}), reusing cached artifact")
+                self.cache_hits.add(stage)
+                return artifact
+        artifact = run()
+        self.stage_cache.put(stage, fingerprint, artifact, output_dir)
+        return artifact
+
+    @staticmethod
+    def _hash_files(*file_paths) -> dict:
+        return {os.path.basename(path): hash_file(path) for path in file_paths if path}
+
+    def start_data_ingestion(self) -> DataIngestionArtifact:
+        try:
+            config = DataIngestionConfig(self.training_pipeline_config)
+            data_ingestion = DataIngestion(config)
+            logger.info('Data ingestion started')
+            artifact = self._run_stage(
+                "ingestion",
+                [data_ingestion.source_fingerprint(), config_fingerprint(config), hash_source(data_ingestion)],
+                DataIngestionArtifact,
+                config.data_ingestion_dir,
+                data_ingestion.run,
+            )
+            logger.info('Data ingestion completed')
+            return artifact
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def start_data_validation(self, data_ingestion_artifact: DataIngestionArtifact) -> DataValidationArtifact:
+        try:
+            config = DataValidationConfig(self.training_pipeline_config)
+            data_validation = DataValidation(data_ingestion_artifact, config)
+            logger.info('Data validation started')
+            # The drift verdict depends on the earlier run's reference profile it is checked against
+            reference_profile_path = None
+            if config.use_cached_reference:
+                _, reference_profile_path = data_validation.load_cached_reference_profile()
+            artifact = self._run_stage(
+                "validation",
+                [
+                    self._hash_files(data_ingestion_artifact.trained_file_path, data_ingestion_artifact.test_file_path),
+                    config_fingerprint(config),
+                    hash_file(self.cache_config.schema_file_path),
+                    hash_file(reference_profile_path) if reference_profile_path else None,
+                    hash_source(data_validation),
+                ],
+                DataValidationArtifact,
+                config.data_validation_dir,
+                data_validation.initiate_data_validation,
+            )
+            logger.info('Data validation completed')
+            return artifact
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def start_data_transformation(self, data_validation_artifact: DataValidationArtifact) -> DataTransformationArtifact:
+        try:
+            config = DataTransformationConfig(self.training_pipeline_config)
+            data_transformation = DataTransformation(data_validation_artifact, config)
+            logger.info('Data transformation started')
+            artifact = self._run_stage(
+                "transformation",
+                [
+                    self._hash_files(
+                        data_validation_artifact.valid_train_file_path, data_validation_artifact.valid_test_file_path
+                    ),
+                    config_fingerprint(config),
+                    hash_source(data_transformation),
+                ],
+                DataTransformationArtifact,
+                config.data_transformation_dir,
+                data_transformation.initiate_data_transformation,
+            )
+            logger.info('Data transformation completed')
+            return artifact
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def start_model_trainer(self, data_transformation_artifact: DataTransformationArtifact) -> ModelTrainerArtifact:
+        try:
+            config = ModelTrainerConfig(self.training_pipeline_config)
+            model_trainer = ModelTrainer(config=config, data_transformation_artifact=data_transformation_artifact)
+            logger.info('Model training started')
+            artifact = self._run_stage(
+                "training",
+                [
+                    self._hash_files(
+                        data_transformation_artifact.transformed_train_file_path,
+                        data_transformation_artifact.transformed_test_file_path,
+                        data_transformation_artifact.transformed_train_target_file_path,
+                        data_transformation_artifact.transformed_test_target_file_path,
+                    ),
+                    config_fingerprint(config),
+                    hash_source(model_trainer),
+                ],
+                ModelTrainerArtifact,
+                config.model_trainer_dir,
+                model_trainer.initiate_model_trainer,
+            )
+            logger.info('Model training completed')
+            return artifact
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def start_model_promotion(
+        self,
+        data_validation_artifact: DataValidationArtifact,
+        data_transformation_artifact: DataTransformationArtifact,
+        model_trainer_artifact: ModelTrainerArtifact,
+    ) -> ModelPromotionArtifact:
+        """Serve the trained model if it beats the one in ``best_model/`` on the holdout split."""
+        try:
+            logger.info('Model promotion started')
+            artifact = ModelPromoter(
+                ModelUpdateConfig(self.training_pipeline_config),
+                data_validation_artifact.valid_test_file_path,
+            ).initiate_model_promotion(
+                model_trainer_artifact.trained_model_file_path,
+                data_transformation_artifact.transformed_object_file_path,
+            )
+            logger.info('Model promotion completed')
+            return artifact
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def start_model_update(self, data_ingestion_artifact: DataIngestionArtifact) -> ModelUpdateArtifact:
+        """Update the served model on this run's new rows; None if that is not possible."""
+        try:
+            if "ingestion" in self.cache_hits or not data_ingestion_artifact.delta_train_file_path:
+                logger.info("No newly ingested rows to update the model with")
+                return None
+
+            # Schema checks only: drift and the reference profile belong to full training runs
+            config = DataValidationConfig(self.training_pipeline_config)
+            data_validation = DataValidation(data_ingestion_artifact, config)
+            data_validation.validate_file(
+                data_ingestion_artifact.delta_train_file_path, config.valid_train_file_path, config.invalid_train_file_path
+            )
+            data_validation.validate_file(
+                data_ingestion_artifact.test_file_path, config.valid_test_file_path, config.invalid_test_file_path
+            )
+
+            logger.info('Incremental model update started')
+            artifact = ModelUpdater(
+                ModelUpdateConfig(self.training_pipeline_config),
+                config.valid_train_file_path,
+                config.valid_test_file_path,
+                delta_rows=data_ingestion_artifact.delta_rows,
+                total_rows=data_ingestion_artifact.total_rows,
+            ).initiate_model_update()
+            logger.info('Incremental model update completed')
+            return artifact
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def run_incremental_pipeline(self):
+        """Update the served model on new data, falling back to a full run when it cannot be."""
+        try:
+            data_ingestion_artifact = self.start_data_ingestion()
+            print(data_ingestion_artifact)
+            if "ingestion" in self.cache_hits:
+                logger.info("Source unchanged since the last ingestion; nothing to retrain")
+                return None
+
+            model_update_artifact = self.start_model_update(data_ingestion_artifact)
+            if model_update_artifact is not None:
+                print(model_update_artifact)
+                return model_update_artifact
+
+            logger.info("Incremental update not possible, running the full pipeline")
+            return self.run_pipeline(data_ingestion_artifact)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def run_pipeline(self, data_ingestion_artifact: DataIngestionArtifact = None) -> ModelTrainerArtifact:
+        """Run every stage; ingestion is skipped when its artifact is passed in."""
+        try:
+            if data_ingestion_artifact is None:
+                data_ingestion_artifact = self.start_data_ingestion()
+            data_validation_artifact = self.start_data_validation(data_ingestion_artifact)
+            print(data_ingestion_artifact)
+            print(data_validation_artifact)
+
+            data_transformation_artifact = self.start_data_transformation(data_validation_artifact)
+            print(data_transformation_artifact)
+
+            model_trainer_artifact = self.start_model_trainer(data_transformation_artifact)
+            print(model_trainer_artifact)
+
+            model_promotion_artifact = self.start_model_promotion(
+                data_validation_artifact, data_transformation_artifact, model_trainer_artifact
+            )
+            print(model_promotion_artifact)
+
+            if self.cache_config.enabled:
+                self.stage_cache.evict(STAGES, keep=self.used_cache_entries)
+            return model_trainer_artifact
+        except Exception as e:
+            raise CustomException(e, sys)
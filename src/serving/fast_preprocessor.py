@@ -0,0 +1,132 @@
+import sys
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix, issparse
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, StandardScaler
+
+from src.utils.exception import CustomException
+from src.utils.log_config import logger
+
+
+def sample_records(preprocessor, n: int, seed: int = 42) -> list:
+    """Random records drawn from the categories and numeric ranges ``preprocessor`` was fitted on."""
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for name, transformer, feature_columns in preprocessor.transformers_:
+        if isinstance(transformer, OneHotEncoder):
+            for col, categories in zip(feature_columns, transformer.categories_):
+                # Cycle through every category so each one is exercised
+                columns[col] = np.resize(rng.permutation(categories), n)
+        elif name != "remainder":
+            scaler = transformer[-1] if isinstance(transformer, Pipeline) else transformer
+            for col, mean, scale in zip(feature_columns, scaler.mean_, scaler.scale_):
+                columns[col] = np.abs(rng.normal(mean, scale, size=n)).round()
+    return pd.DataFrame(columns).to_dict("records")
+
+
+class FastPreprocessor:
+    """The fitted ColumnTransformer reduced to lookups for scoring a few records.
+
+    Each categorical column becomes a ``category -> output column`` dict and
+    the numeric block a vector of means and scales, so ``transform`` fills a
+    preallocated row per record instead of going through pandas and the
+    ColumnTransformer's validation. Numerics are cast to the output dtype
+    before centring and scaling, in the same order as the sklearn pipeline,
+    so results match it exactly. Unknown categories leave their block at 0,
+    as ``handle_unknown='ignore'`` does.
+    """
+
+    def __init__(self, preprocessor, dtype):
+        self.dtype = np.dtype(dtype)
+        self.n_features = len(preprocessor.get_feature_names_out())
+        self.sparse_output = False
+        self.category_index = {}
+        numeric_columns, numeric_index, means, scales = [], [], [], []
+
+        for name, transformer, feature_columns in preprocessor.transformers_:
+            if name == "remainder":
+                if transformer != "drop":
+                    raise ValueError(f"Unsupported remainder={transformer!r}")
+                continue
+            output = preprocessor.output_indices_[name]
+            if isinstance(transformer, OneHotEncoder):
+                if transformer.drop is not None or transformer.handle_unknown != "ignore":
+                    raise ValueError("Only OneHotEncoder(drop=None, handle_unknown='ignore') is supported")
+                self.sparse_output = self.sparse_output or transformer.sparse_output
+                offset = output.start
+                for col, categories in zip(feature_columns, transformer.categories_):
+                    self.category_index[col] = {category: offset + i for i, category in enumerate(categories)}
+                    offset += len(categories)
+                continue
+
+            steps = [step for _, step in transformer.steps] if isinstance(transformer, Pipeline) else [transformer]
+            scaler = steps[-1]
+            if not isinstance(scaler, StandardScaler) or len(steps) > 2 or (
+                len(steps) == 2 and not self.is_output_cast(steps[0])
+            ):
+                raise ValueError(f"Unsupported transformer {name!r}: {transformer}")
+            numeric_columns.extend(feature_columns)
+            numeric_index.extend(range(output.start, output.stop))
+            means.append(scaler.mean_ if scaler.with_mean else np.zeros(len(feature_columns)))
+            scales.append(scaler.scale_ if scaler.with_std else np.ones(len(feature_columns)))
+
+        self.numeric_columns = numeric_columns
+        self.numeric_index = np.array(numeric_index, dtype=np.intp)
+        # StandardScaler casts its statistics to the data dtype before applying them
+        self.mean = (np.concatenate(means) if means else np.zeros(0)).astype(self.dtype)
+        self.scale = (np.concatenate(scales) if scales else np.ones(0)).astype(self.dtype)
+
+    def is_output_cast(self, step) -> bool:
+        """True for the ``FunctionTransformer(np.asarray, kw_args={'dtype': ...})`` cast to the output dtype."""
+        return (
+            isinstance(step, FunctionTransformer)
+            and step.func is np.asarray
+            and step.inverse_func is None
+            and set(step.kw_args or {}) == {"dtype"}
+            and np.dtype(step.kw_args["dtype"]) == self.dtype
+        )
+
+    def transform(self, records: list):
+        """Encode a list of record dicts exactly as ``preprocessor.transform`` would."""
+        X = np.zeros((len(records), self.n_features), dtype=self.dtype)
+        for i, record in enumerate(records):
+            for col, index in self.category_index.items():
+                column = index.get(record.get(col))
+                if column is not None:
+                    X[i, column] = 1
+        numerics = np.array(
+            [[record.get(col, np.nan) for col in self.numeric_columns] for record in records], dtype=np.float64
+        )
+        # Same operation order (and rounding) as cast -> StandardScaler
+        X[:, self.numeric_index] = numerics.astype(self.dtype)
+        block = X[:, self.numeric_index]
+        block -= self.mean
+        block /= self.scale
+        X[:, self.numeric_index] = block
+        return csr_matrix(X) if self.sparse_output else X
+
+
+def compile_preprocessor(preprocessor, n_check: int = 256) -> FastPreprocessor:
+    """Compile a fitted preprocessor and check it against sklearn on ``n_check`` sample records.
+
+    Raises if the preprocessor has a shape this fast path does not cover or if
+    any output differs, so callers can fall back to ``preprocessor.transform``.
+    """
+    try:
+        records = sample_records(preprocessor, n_check)
+        # Unknown categories and every known category must encode the same way
+        records.append({**records[0], **{col: "__unseen__" for col in records[0] if isinstance(records[0][col], str)}})
+        expected = preprocessor.transform(pd.DataFrame.from_records(records, columns=list(records[0])))
+        fast = FastPreprocessor(preprocessor, expected.dtype)
+        actual = fast.transform(records)
+
+        expected = expected.toarray() if issparse(expected) else expected
+        actual = actual.toarray() if issparse(actual) else actual
+        if actual.shape != expected.shape or not np.allclose(actual, expected, rtol=1e-6, atol=1e-7):
+            mismatch = np.abs(actual - expected).max() if actual.shape == expected.shape else actual.shape
+            raise ValueError(f"Fast preprocessor disagrees with the sklearn transformer (max difference {mismatch})")
+        logger.info(f"Compiled fast preprocessor ({fast.n_features} features, parity checked on {len(records)} records)")
+        return fast
+    except Exception as e:
+        raise CustomException(e, sys)
@@ -0,0 +1,116 @@
+"""Load test for online inference, with and without micro-batching and the fast preprocessor.
+
+In-process (default) it drives the model in ``best_model/`` from
+``--concurrency`` client threads, each sending single-car requests, scoring
+every request on its own and through a MicroBatcher, each with the sklearn
+preprocessor and with the compiled fast preprocessor::
+
+    python -m src.serving.load_test --concurrency 32 --requests 200
+
+With ``--url`` it sends the same requests to a running ``/predict`` endpoint
+instead; start the app once with ``MICRO_BATCHING=0`` and once without to
+compare::
+
+    python -m src.serving.load_test --url http://localhost:5000/predict
+"""
+import argparse
+import json
+import os
+import pickle
+import threading
+import time
+import urllib.request
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.serving.fast_preprocessor import compile_preprocessor, sample_records
+from src.serving.micro_batcher import MicroBatcher, MICRO_BATCH_MAX_LATENCY_MS, MICRO_BATCH_MAX_SIZE
+
+BEST_MODEL_DIR = "best_model"
+
+
+def run_clients(send, cars: list, concurrency: int, requests_per_client: int) -> dict:
+    """Send single-car requests from ``concurrency`` threads; return throughput and latency percentiles."""
+    latencies = [[] for _ in range(concurrency)]
+    barrier = threading.Barrier(concurrency + 1)
+
+    def client(i):
+        barrier.wait()
+        for j in range(requests_per_client):
+            car = cars[(i * requests_per_client + j) % len(cars)]
+            start = time.perf_counter()
+            send([car])
+            latencies[i].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    all_latencies = np.concatenate(latencies) * 1000
+    return {
+        "requests": len(all_latencies),
+        "requests_per_second": len(all_latencies) / elapsed,
+        "p50_ms": np.percentile(all_latencies, 50),
+        "p99_ms": np.percentile(all_latencies, 99),
+    }
+
+
+def http_sender(url: str):
+    def send(records):
+        body = json.dumps({"cars": records}).encode()
+        request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request) as response:
+            return json.load(response)["predictions"]
+    return send
+
+
+def report(label: str, result: dict) -> None:
+    print(
+        f"{label:<13} {result['requests']:>7} requests  {result['requests_per_second']:>8.0f} req/s  "
+        f"p50 {result['p50_ms']:>7.1f} ms  p99 {result['p99_ms']:>7.1f} ms"
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test online inference with and without micro-batching")
+    parser.add_argument("--url", help="POST to this /predict endpoint instead of scoring in-process")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent client threads")
+    parser.add_argument("--requests", type=int, default=200, help="requests per client")
+    parser.add_argument("--max-batch-size", type=int, default=MICRO_BATCH_MAX_SIZE)
+    parser.add_argument("--max-latency-ms", type=float, default=MICRO_BATCH_MAX_LATENCY_MS)
+    parser.add_argument("--model-dir", default=BEST_MODEL_DIR)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    with open(os.path.join(args.model_dir, "transformed_object", "preprocessing.pkl"), "rb") as f:
+        preprocessor = pickle.load(f)
+    cars = sample_records(preprocessor, 1000)
+
+    if args.url:
+        report("server", run_clients(http_sender(args.url), cars, args.concurrency, args.requests))
+    else:
+        model = joblib.load(os.path.join(args.model_dir, "model.pkl"))
+        columns = list(cars[0])
+
+        fast_preprocessor = compile_preprocessor(preprocessor)
+
+        def score_records(records):
+            return model.predict(preprocessor.transform(pd.DataFrame.from_records(records, columns=columns)))
+
+        def fast_score_records(records):
+            return model.predict(fast_preprocessor.transform(records))
+
+        for label, score in [("direct", score_records), ("fast", fast_score_records)]:
+            report(label, run_clients(score, cars, args.concurrency, args.requests))
+            batcher = MicroBatcher(score, max_batch_size=args.max_batch_size, max_latency_ms=args.max_latency_ms)
+            report(f"{label}+batch", run_clients(batcher.predict, cars, args.concurrency, args.requests))
+            print(f"{'':<13} {batcher.rows} rows in {batcher.batches} predict calls "
+                  f"({batcher.rows / max(batcher.batches, 1):.1f} rows per call)")
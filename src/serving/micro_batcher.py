@@ -0,0 +1,98 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from src.utils.log_config import logger
+
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", 64))
+MICRO_BATCH_MAX_LATENCY_MS = float(os.getenv("MICRO_BATCH_MAX_LATENCY_MS", 5))
+
+
+class MicroBatcher:
+    """Coalesce concurrent prediction requests into one ``predict_fn`` call.
+
+    Request threads hand their rows to ``submit`` and wait on the returned
+    future. A single worker thread takes the first waiting request, keeps
+    collecting requests until ``max_batch_size`` rows are queued or
+    ``max_latency_ms`` has passed since that first request arrived, then scores
+    all rows with one ``predict_fn(rows)`` call and hands each request its own
+    slice of the result, in order. Under load this replaces many per-row
+    pandas/sklearn calls with a few vectorized ones; an idle server adds at
+    most ``max_latency_ms`` to a request. A request larger than
+    ``max_batch_size`` is scored as a batch of its own. If a batch fails,
+    its requests are scored one by one, so a bad request only fails itself.
+    """
+
+    def __init__(self, predict_fn, max_batch_size: int = MICRO_BATCH_MAX_SIZE,
+                 max_latency_ms: float = MICRO_BATCH_MAX_LATENCY_MS):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.batches = 0
+        self.rows = 0
+        self._queue = queue.Queue()
+        self._pending = None
+        self._thread = threading.Thread(target=self._worker, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, rows: list) -> Future:
+        """Queue ``rows`` (a list of records); the future resolves to their predictions."""
+        future = Future()
+        self._queue.put((rows, future))
+        return future
+
+    def predict(self, rows: list, timeout: float = None) -> list:
+        return self.submit(rows).result(timeout)
+
+    def _next_batch(self) -> list:
+        # A request that did not fit in the previous batch opens the next one
+        first = self._pending or self._queue.get()
+        self._pending = None
+        batch, n_rows = [first], len(first[0])
+        deadline = time.monotonic() + self.max_latency
+        while n_rows < self.max_batch_size:
+            try:
+                request = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if n_rows + len(request[0]) > self.max_batch_size:
+                self._pending = request
+                break
+            batch.append(request)
+            n_rows += len(request[0])
+        return batch
+
+    def _score(self, batch: list) -> None:
+        rows = [row for request_rows, _ in batch for row in request_rows]
+        predictions = self.predict_fn(rows)
+        if len(predictions) != len(rows):
+            raise ValueError(f"predict_fn returned {len(predictions)} predictions for {len(rows)} rows")
+        self.batches += 1
+        start = 0
+        for rows, future in batch:
+            future.set_result(list(predictions[start:start + len(rows)]))
+            start += len(rows)
+        self.rows += start
+
+    def _worker(self) -> None:
+        while True:
+            batch = self._next_batch()
+            batch = [(rows, future) for rows, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                self._score(batch)
+            except Exception as e:
+                if len(batch) == 1:
+                    logger.error(f"Micro-batch request failed: {e}")
+                    batch[0][1].set_exception(e)
+                    continue
+                # Score each request on its own so only the bad one fails
+                logger.warning(f"Micro-batch of {len(batch)} requests failed ({e}), scoring them one by one")
+                for request in batch:
+                    try:
+                        self._score([request])
+                    except Exception as request_error:
+                        request[1].set_exception(request_error)
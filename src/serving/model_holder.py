@@ -0,0 +1,237 @@
+import gc
+import hashlib
+import io
+import os
+import pickle
+import sys
+import threading
+import time
+from dataclasses import dataclass
+import joblib
+import pandas as pd
+
+from src.serving.fast_preprocessor import FastPreprocessor, compile_preprocessor, sample_records
+from src.utils.exception import CustomException
+from src.utils.log_config import logger
+
+MODEL_WATCH_INTERVAL_SECONDS = float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS", 5))
+MODEL_WARMUP_ROWS = int(os.getenv("MODEL_WARMUP_ROWS", 64))
+
+
+def files_signature(file_paths: list) -> tuple:
+    return tuple((os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in file_paths)
+
+
+def files_checksum(file_paths: list) -> str:
+    digest = hashlib.sha256()
+    for path in file_paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def contents_checksum(contents: list) -> str:
+    """``files_checksum`` of files already read into memory."""
+    digest = hashlib.sha256()
+    for content in contents:
+        digest.update(content)
+    return digest.hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    preprocessor: object
+    fast_preprocessor: FastPreprocessor
+    model: object
+    feature_columns: list
+    version: str
+
+    def predict(self, records: list):
+        """Predict for a list of car records, with the fast preprocessor when compiled."""
+        if self.fast_preprocessor is not None:
+            return self.model.predict(self.fast_preprocessor.transform(records))
+        input_df = pd.DataFrame.from_records(records, columns=self.feature_columns)
+        return self.model.predict(self.preprocessor.transform(input_df))
+
+
+def prepare_bundle(preprocessor, model, version: str, fast_preprocessor: bool = True,
+                   warmup_rows: int = MODEL_WARMUP_ROWS) -> ModelBundle:
+    """Compile the fast preprocessor for a loaded model and warm it up on sample records."""
+    try:
+        fast = None
+        if fast_preprocessor:
+            try:
+                fast = compile_preprocessor(preprocessor)
+            except Exception as e:
+                logger.warning(f"Fast preprocessor unavailable, using the sklearn transformer: {e}")
+        bundle = ModelBundle(preprocessor, fast, model, list(preprocessor.feature_names_in_), version)
+
+        # Warm both encoders and the model on single rows and a batch
+        records = sample_records(preprocessor, warmup_rows)
+        for batch in (records[:1], records):
+            bundle.predict(batch)
+            if fast is not None:
+                model.predict(preprocessor.transform(pd.DataFrame.from_records(batch, columns=bundle.feature_columns)))
+        return bundle
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+class ModelHolder:
+    """Owns the served preprocessor and model, loaded eagerly and swapped atomically.
+
+    ``load`` unpickles both files, compiles the fast preprocessor and runs
+    warmup predictions, so the first request after startup (or a reload) pays
+    no load cost. The current :class:`ModelBundle` is replaced by a single
+    reference assignment, and ``predict`` takes that reference once per call:
+    requests in flight finish on the bundle they started with, new ones get
+    the new bundle, and nothing is dropped. A bundle that fails to load or
+    warm up (for example a model and preprocessor from different runs caught
+    mid-deploy) is discarded and the current one keeps serving.
+
+    A new ``best_model/`` version is detected by polling size/mtime and
+    confirming with a content checksum once the files have stopped changing.
+    In a single process ``watch`` reloads in the background. Under gunicorn the
+    master preloads the model before forking, so workers share its pages
+    copy-on-write, and ``watch`` only asks the master to reload and replace its
+    workers (see ``app/gunicorn.conf.py``), keeping one copy per host.
+
+    With ``release_on_reload`` (the gunicorn master, which serves no requests
+    itself) the old bundle is freed before the new one loads, so the two never
+    share memory; the old files' bytes are kept so it can be restored if the
+    new version fails to load.
+    """
+
+    def __init__(self, model_file_path: str, preprocessing_object_file_path: str,
+                 fast_preprocessor: bool = True, warmup_rows: int = MODEL_WARMUP_ROWS,
+                 release_on_reload: bool = False):
+        self.model_file_path = model_file_path
+        self.preprocessing_object_file_path = preprocessing_object_file_path
+        self.use_fast_preprocessor = fast_preprocessor
+        self.warmup_rows = warmup_rows
+        self.release_on_reload = release_on_reload
+        self.reloads = 0
+        self._bundle = None
+        self._contents = None
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    @property
+    def file_paths(self) -> list:
+        return [self.model_file_path, self.preprocessing_object_file_path]
+
+    @property
+    def bundle(self) -> ModelBundle:
+        if self._bundle is None:
+            self.reload()
+        return self._bundle
+
+    @property
+    def version(self) -> str:
+        return self.bundle.version
+
+    def read_files(self) -> list:
+        contents = []
+        for path in self.file_paths:
+            with open(path, "rb") as f:
+                contents.append(f.read())
+        return contents
+
+    def load(self, contents: list = None) -> ModelBundle:
+        """Load and warm up a bundle from ``read_files`` contents (the current files by default) without installing it."""
+        try:
+            start = time.perf_counter()
+            contents = contents if contents is not None else self.read_files()
+            version = contents_checksum(contents)
+            model = joblib.load(io.BytesIO(contents[0]))
+            preprocessor = pickle.loads(contents[1])
+            bundle = prepare_bundle(preprocessor, model, version, self.use_fast_preprocessor, self.warmup_rows)
+            logger.info(f"Loaded model version {version} in {time.perf_counter() - start:.2f}s (warmed up)")
+            return bundle
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def reload(self) -> bool:
+        """Install the files' current version if it differs from the served one; True if swapped."""
+        with self._lock:
+            contents = self.read_files()
+            if self._bundle is not None and contents_checksum(contents) == self._bundle.version:
+                return False
+            previous_version = self._bundle.version if self._bundle is not None else None
+            if self.release_on_reload and self._bundle is not None:
+                self._bundle = None
+                self._collect()
+                try:
+                    bundle = self.load(contents)
+                except Exception:
+                    logger.error(f"New model version failed to load, restoring version {previous_version}")
+                    self._bundle = self.load(self._contents)
+                    raise
+                self._bundle = bundle
+            else:
+                bundle = self.load(contents)
+                self._bundle = bundle
+            self._contents = contents if self.release_on_reload else None
+            if previous_version is not None:
+                self.reloads += 1
+        if previous_version is not None:
+            logger.info(f"Model version {previous_version} replaced by {bundle.version}")
+            self._collect()
+        return True
+
+    @staticmethod
+    def _collect() -> None:
+        # Objects frozen before a fork (see app/gunicorn.conf.py) are never collected; thaw them first
+        gc.unfreeze()
+        gc.collect()
+
+    def changed(self) -> str:
+        """Checksum of the files if they hold a settled version other than the served one, else None."""
+        try:
+            signature = files_signature(self.file_paths)
+            # Only act on files that have stopped changing, so a deploy is not caught halfway
+            time.sleep(min(1.0, MODEL_WATCH_INTERVAL_SECONDS))
+            if files_signature(self.file_paths) != signature:
+                return None
+            checksum = files_checksum(self.file_paths)
+        except OSError:
+            return None
+        served = self._bundle.version if self._bundle is not None else None
+        return checksum if checksum != served else None
+
+    def watch(self, interval: float = MODEL_WATCH_INTERVAL_SECONDS, on_change=None) -> None:
+        """Poll for new versions in a daemon thread; reload in-process, or call ``on_change(version)`` instead."""
+        if self._watcher is not None:
+            return
+
+        def run():
+            signature, notified = None, None
+            while True:
+                time.sleep(interval)
+                try:
+                    current = files_signature(self.file_paths)
+                    if current == signature:
+                        continue
+                    version = self.changed()
+                    if version is None:
+                        signature = current
+                        continue
+                    if on_change is None:
+                        self.reload()
+                    elif version != notified:
+                        notified = version
+                        on_change(version)
+                    signature = files_signature(self.file_paths)
+                except Exception as e:
+                    # Keep serving the current bundle; try again on the next change
+                    served = self._bundle.version if self._bundle is not None else None
+                    logger.error(f"Model reload failed, still serving version {served}: {e}")
+                    signature = current
+
+        self._watcher = threading.Thread(target=run, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def predict(self, records: list):
+        """Predict for a list of car records with one bundle throughout."""
+        return self.bundle.predict(records)
@@ -0,0 +1,170 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from src.utils.log_config import logger
+
+PREDICTION_CACHE_MAX_SIZE = int(os.getenv("PREDICTION_CACHE_MAX_SIZE", 100_000))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", 3600))
+# Numeric bucket widths, e.g. "mileage=1000,engine_hp=5"; unlisted numerics are cached exactly
+PREDICTION_CACHE_BUCKETS = os.getenv("PREDICTION_CACHE_BUCKETS", "")
+# redis://... to share entries between workers; needs the optional redis package
+PREDICTION_CACHE_REDIS_URL = os.getenv("PREDICTION_CACHE_REDIS_URL")
+
+
+def parse_buckets(spec: str) -> dict:
+    return {col.strip(): float(width) for col, width in (item.split("=") for item in spec.split(",") if item.strip())}
+
+
+class PredictionCache:
+    """Bounded LRU + TTL cache of predictions keyed on canonicalized inputs.
+
+    ``canonicalize`` strips categorical values and snaps bucketed numerics to
+    their bucket (``round(value / width) * width``); callers predict on the
+    canonical record, so a cached value is exactly the model's prediction for
+    its key. Entries live in-process and, with ``redis_url``, in a shared
+    Redis under a key prefix containing the model version (a checksum of the
+    model files), so workers share results and never read entries of another
+    model version. ``set_version`` drops the local entries when the served
+    model changes.
+    """
+
+    def __init__(
+        self,
+        feature_columns: list,
+        numeric_columns: list,
+        version: str,
+        max_size: int = PREDICTION_CACHE_MAX_SIZE,
+        ttl_seconds: float = PREDICTION_CACHE_TTL_SECONDS,
+        buckets: dict = None,
+        redis_url: str = PREDICTION_CACHE_REDIS_URL,
+    ):
+        self.feature_columns = feature_columns
+        self.numeric_columns = set(numeric_columns)
+        self.version = version
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.buckets = parse_buckets(PREDICTION_CACHE_BUCKETS) if buckets is None else buckets
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = self._connect(redis_url) if redis_url else None
+
+    @staticmethod
+    def _connect(redis_url: str):
+        try:
+            import redis
+            client = redis.Redis.from_url(redis_url, socket_timeout=0.05)
+            client.ping()
+            return client
+        except Exception as e:
+            logger.warning(f"Shared prediction cache unavailable, caching in-process only: {e}")
+            return None
+
+    def canonicalize(self, record: dict) -> dict:
+        canonical = {}
+        for col in self.feature_columns:
+            value = record.get(col)
+            if col in self.numeric_columns:
+                value = float(value)
+                width = self.buckets.get(col)
+                if width:
+                    value = round(value / width) * width
+            else:
+                value = str(value).strip()
+            canonical[col] = value
+        return canonical
+
+    def _key(self, record: dict) -> str:
+        return json.dumps([record[col] for col in self.feature_columns])
+
+    def _redis_key(self, key: str) -> str:
+        return f"autosense:prediction:{self.version}:{key}"
+
+    def set_version(self, version: str) -> None:
+        """Follow the served model version, dropping entries of the previous one."""
+        if version == self.version:
+            return
+        with self._lock:
+            if version == self.version:
+                return
+            self._entries.clear()
+            self.version = version
+            self.invalidations += 1
+        logger.info(f"Model version changed to {version}; prediction cache cleared")
+
+    def get_many(self, records: list) -> list:
+        """Cached predictions for canonical ``records``, None where missing or expired."""
+        keys = [self._key(record) for record in records]
+        values = [None] * len(keys)
+        now = time.monotonic()
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[1] <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                values[i] = entry[0]
+
+        missing = [i for i, value in enumerate(values) if value is None]
+        if missing and self._redis is not None:
+            try:
+                shared = self._redis.mget([self._redis_key(keys[i]) for i in missing])
+                found = {i: float(value) for i, value in zip(missing, shared) if value is not None}
+                for i, value in found.items():
+                    values[i] = value
+                self._store_local({keys[i]: value for i, value in found.items()})
+            except Exception as e:
+                logger.warning(f"Shared prediction cache read failed: {e}")
+
+        hits = sum(value is not None for value in values)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(values) - hits
+        return values
+
+    def _store_local(self, entries: dict) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key, value in entries.items():
+                self._entries[key] = (value, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def put_many(self, records: list, values: list) -> None:
+        entries = {self._key(record): float(value) for record, value in zip(records, values)}
+        self._store_local(entries)
+        if self._redis is not None:
+            try:
+                pipeline = self._redis.pipeline(transaction=False)
+                for key, value in entries.items():
+                    pipeline.set(self._redis_key(key), value, ex=max(int(self.ttl_seconds), 1))
+                pipeline.execute()
+            except Exception as e:
+                logger.warning(f"Shared prediction cache write failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "model_version": self.version,
+                "shared": self._redis is not None,
+                "pid": os.getpid(),
+            }
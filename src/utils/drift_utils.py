@@ -0,0 +1,242 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2_contingency, ks_2samp, kstwo
+
+from src.utils.exception import CustomException
+
+# Below this many rows per side scipy's exact KS p-value is cheap; above it the
+# asymptotic distribution is used on the already-sorted arrays.
+EXACT_KS_MAX_ROWS = 10_000
+PSI_EPSILON = 1e-6
+MISSING_CATEGORY = "<missing>"
+
+
+def population_stability_index(expected_counts: np.ndarray, actual_counts: np.ndarray) -> float:
+    expected = np.clip(expected_counts / max(expected_counts.sum(), 1), PSI_EPSILON, None)
+    actual = np.clip(actual_counts / max(actual_counts.sum(), 1), PSI_EPSILON, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def numeric_drift(base: np.ndarray, current: np.ndarray, psi_bins: int = 10) -> dict:
+    """KS, PSI and Wasserstein-1 for one numeric column from a single sort of each side."""
+    base = np.sort(base[~np.isnan(base)])
+    current = np.sort(current[~np.isnan(current)])
+    n, m = len(base), len(current)
+    if n == 0 or m == 0:
+        return {"test": "ks", "statistic": 0.0, "p_value": 1.0, "psi": 0.0, "wasserstein": 0.0}
+
+    # Both empirical CDFs evaluated on the pooled sample
+    pooled = np.sort(np.concatenate([base, current]))
+    cdf_base = np.searchsorted(base, pooled, side="right") / n
+    cdf_current = np.searchsorted(current, pooled, side="right") / m
+    cdf_gap = np.abs(cdf_base - cdf_current)
+    statistic = float(cdf_gap.max())
+    if max(n, m) <= EXACT_KS_MAX_ROWS:
+        p_value = float(ks_2samp(base, current).pvalue)
+    else:
+        p_value = float(kstwo.sf(statistic, np.round(n * m / (n + m))))
+    wasserstein = float(np.sum(cdf_gap[:-1] * np.diff(pooled)))
+
+    # PSI over base-quantile bins
+    edges = np.unique(np.quantile(base, np.linspace(0, 1, psi_bins + 1))[1:-1])
+    base_counts = np.diff(np.concatenate([[0], np.searchsorted(base, edges, side="right"), [n]]))
+    current_counts = np.diff(np.concatenate([[0], np.searchsorted(current, edges, side="right"), [m]]))
+
+    return {
+        "test": "ks",
+        "statistic": statistic,
+        "p_value": p_value,
+        "psi": population_stability_index(base_counts, current_counts),
+        "wasserstein": wasserstein,
+    }
+
+
+def category_counts(series: pd.Series) -> pd.Series:
+    return series.astype(object).where(series.notna(), MISSING_CATEGORY).value_counts()
+
+
+def categorical_drift(base_counts: pd.Series, current_counts: pd.Series) -> dict:
+    """Chi-square test of homogeneity and PSI over category frequency tables."""
+    categories = base_counts.index.union(current_counts.index)
+    table = np.vstack([
+        base_counts.reindex(categories, fill_value=0).to_numpy(dtype=float),
+        current_counts.reindex(categories, fill_value=0).to_numpy(dtype=float),
+    ])
+    if table.shape[1] < 2 or table[0].sum() == 0 or table[1].sum() == 0:
+        statistic, p_value = 0.0, 1.0
+    else:
+        statistic, p_value, _, _ = chi2_contingency(table, correction=False)
+    return {
+        "test": "chi_square",
+        "statistic": float(statistic),
+        "p_value": float(p_value),
+        "psi": population_stability_index(table[0], table[1]),
+    }
+
+
+def column_drift(base: pd.Series, current: pd.Series, psi_bins: int = 10) -> dict:
+    if pd.api.types.is_numeric_dtype(base) and pd.api.types.is_numeric_dtype(current):
+        return numeric_drift(
+            base.to_numpy(dtype=float, na_value=np.nan),
+            current.to_numpy(dtype=float, na_value=np.nan),
+            psi_bins,
+        )
+    return categorical_drift(category_counts(base), category_counts(current))
+
+
+def compute_drift_report(
+    base_df: pd.DataFrame,
+    current_df: pd.DataFrame,
+    threshold: float = 0.05,
+    psi_bins: int = 10,
+    max_workers: int = None,
+):
+    """Evaluate every shared column in parallel and return ``(no_drift, report)``.
+
+    Numeric columns use KS (plus PSI and Wasserstein); categoricals use a
+    chi-square test (plus PSI). A column drifts when its p-value is below
+    ``threshold``.
+    """
+    try:
+        columns = [col for col in base_df.columns if col in current_df.columns]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(lambda col: column_drift(base_df[col], current_df[col], psi_bins), columns)
+            report = dict(zip(columns, results))
+
+        status = True
+        for result in report.values():
+            result["drift_status"] = bool(result["p_value"] < threshold)
+            if result["drift_status"]:
+                status = False
+        return status, report
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+# Numeric columns with at most this many distinct values are profiled exactly
+# (value -> count); wider ones keep a quantile sketch.
+PROFILE_MAX_DISCRETE_VALUES = 1000
+PROFILE_QUANTILES = 1001
+
+
+def _numeric_profile(values: np.ndarray, psi_bins: int) -> dict:
+    missing = int(np.isnan(values).sum())
+    values = np.sort(values[~np.isnan(values)])
+    profile = {"type": "numeric", "count": int(len(values)), "missing": missing}
+    if len(values) == 0:
+        return profile
+
+    distinct, counts = np.unique(values, return_counts=True)
+    if len(distinct) <= PROFILE_MAX_DISCRETE_VALUES:
+        profile["values"] = distinct.tolist()
+        profile["value_counts"] = counts.tolist()
+    else:
+        profile["quantiles"] = np.quantile(values, np.linspace(0, 1, PROFILE_QUANTILES)).tolist()
+
+    edges = np.unique(np.quantile(values, np.linspace(0, 1, psi_bins + 1))[1:-1])
+    profile["bin_edges"] = edges.tolist()
+    profile["bin_counts"] = np.diff(
+        np.concatenate([[0], np.searchsorted(values, edges, side="right"), [len(values)]])
+    ).tolist()
+    profile["mean"] = float(values.mean())
+    profile["std"] = float(values.std())
+    return profile
+
+
+def build_reference_profile(df: pd.DataFrame, psi_bins: int = 10) -> dict:
+    """Summarise a dataset into a small, YAML-serialisable drift reference.
+
+    Numeric columns keep an exact value table or a quantile sketch plus PSI
+    histogram; categorical columns keep their category frequency table.
+    """
+    try:
+        columns = {}
+        for col in df.columns:
+            if pd.api.types.is_numeric_dtype(df[col]):
+                columns[col] = _numeric_profile(df[col].to_numpy(dtype=float, na_value=np.nan), psi_bins)
+            else:
+                counts = category_counts(df[col])
+                columns[col] = {
+                    "type": "categorical",
+                    "count": int(counts.sum()),
+                    "frequencies": {str(k): int(v) for k, v in counts.items()},
+                }
+        return {"rows": int(len(df)), "columns": columns}
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def _profile_cdf(column_profile: dict):
+    if "values" in column_profile:
+        support = np.asarray(column_profile["values"], dtype=float)
+        cumulative = np.cumsum(column_profile["value_counts"]) / column_profile["count"]
+        return support, lambda x: np.concatenate([[0.0], cumulative])[np.searchsorted(support, x, side="right")], False
+    quantiles = np.asarray(column_profile["quantiles"], dtype=float)
+    levels = np.linspace(0, 1, len(quantiles))
+    return quantiles, lambda x: np.interp(x, quantiles, levels, left=0.0, right=1.0), True
+
+
+def numeric_drift_from_profile(column_profile: dict, current: np.ndarray) -> dict:
+    """KS, PSI and Wasserstein-1 of ``current`` against a profiled reference column."""
+    current = np.sort(current[~np.isnan(current)])
+    n, m = column_profile["count"], len(current)
+    if n == 0 or m == 0:
+        return {"test": "ks", "statistic": 0.0, "p_value": 1.0, "psi": 0.0, "wasserstein": 0.0}
+
+    support, reference_cdf, continuous = _profile_cdf(column_profile)
+    points = np.union1d(support, current)
+    cdf_gap = np.abs(reference_cdf(points) - np.searchsorted(current, points, side="right") / m)
+    statistic = float(cdf_gap.max())
+    if continuous:
+        # A continuous reference can also peak just before a jump of the current ECDF
+        left_gap = np.abs(reference_cdf(current) - np.searchsorted(current, current, side="left") / m)
+        statistic = max(statistic, float(left_gap.max()))
+    p_value = float(kstwo.sf(statistic, np.round(n * m / (n + m))))
+    wasserstein = float(np.sum(cdf_gap[:-1] * np.diff(points)))
+
+    edges = np.asarray(column_profile["bin_edges"], dtype=float)
+    current_counts = np.diff(np.concatenate([[0], np.searchsorted(current, edges, side="right"), [m]]))
+    return {
+        "test": "ks",
+        "statistic": statistic,
+        "p_value": p_value,
+        "psi": population_stability_index(np.asarray(column_profile["bin_counts"], dtype=float), current_counts),
+        "wasserstein": wasserstein,
+    }
+
+
+def column_drift_from_profile(column_profile: dict, current: pd.Series) -> dict:
+    if column_profile["type"] == "numeric":
+        return numeric_drift_from_profile(column_profile, current.to_numpy(dtype=float, na_value=np.nan))
+    return categorical_drift(pd.Series(column_profile["frequencies"], dtype=float), category_counts(current))
+
+
+def compute_drift_report_from_profile(
+    profile: dict,
+    current_df: pd.DataFrame,
+    threshold: float = 0.05,
+    max_workers: int = None,
+):
+    """Like ``compute_drift_report`` but against a cached reference profile.
+
+    Only ``current_df`` is scanned, so this is what serving-time monitoring and
+    later pipeline runs use instead of reloading the training data.
+    """
+    try:
+        columns = [col for col in profile["columns"] if col in current_df.columns]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(
+                lambda col: column_drift_from_profile(profile["columns"][col], current_df[col]), columns
+            )
+            report = dict(zip(columns, results))
+
+        status = True
+        for result in report.values():
+            result["drift_status"] = bool(result["p_value"] < threshold)
+            if result["drift_status"]:
+                status = False
+        return status, report
+    except Exception as e:
+        raise CustomException(e, sys)
@@ -2,8 +2,11 @@ from src.utils.log_config import logger
 from src.utils.exception import CustomException
 import yaml
 import os,sys,numpy as np
-from sklearn.model_selection import GridSearchCV
-from sklearn.metrics import r2_score
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from scipy import sparse
+from datetime import datetime
 
 
 
@@ -25,6 +28,183 @@ def write_yaml_file(file_path:str,content:object,replace:bool=False)->None:
     except Exception as e:
         raise CustomException(e,sys)
 
+def list_previous_artifact_dirs(artifact_root:str,current_artifact_dir:str,timestamp_format:str)->list:
+    """Return earlier ``Artifacts/<timestamp>`` run directories, newest first."""
+    try:
+        if not os.path.isdir(artifact_root):
+            return []
+        runs=[]
+        for name in os.listdir(artifact_root):
+            run_dir=os.path.join(artifact_root,name)
+            if os.path.normpath(run_dir)==os.path.normpath(current_artifact_dir):
+                continue
+            try:
+                runs.append((datetime.strptime(name,timestamp_format),run_dir))
+            except ValueError:
+                continue
+        return [run_dir for _,run_dir in sorted(runs,reverse=True)]
+    except Exception as e:
+        raise CustomException(e,sys)
+
+
+def is_parquet(file_path:str)->bool:
+    return file_path.endswith(".parquet")
+
+def get_table_columns(file_path:str)->list:
+    """Return the column names of a Parquet or CSV artifact without loading its rows."""
+    try:
+        if is_parquet(file_path):
+            return pq.read_schema(file_path).names
+        return list(pd.read_csv(file_path,nrows=0).columns)
+    except Exception as e:
+        raise CustomException(e,sys)
+
+def read_table(file_path:str,columns:list=None)->pd.DataFrame:
+    """Read a Parquet or CSV artifact, loading only ``columns`` when given.
+
+    Parquet keeps numeric dtypes and categorical dictionaries, so no parsing or
+    type inference happens on the way back in.
+    """
+    try:
+        if is_parquet(file_path):
+            return pd.read_parquet(file_path,columns=columns)
+        return pd.read_csv(file_path,usecols=columns)
+    except Exception as e:
+        raise CustomException(e,sys)
+
+def count_table_rows(file_path:str)->int:
+    try:
+        if is_parquet(file_path):
+            return pq.ParquetFile(file_path).metadata.num_rows
+        return sum(len(chunk) for chunk in pd.read_csv(file_path,usecols=[0],chunksize=1_000_000))
+    except Exception as e:
+        raise CustomException(e,sys)
+
+def iter_table_chunks(file_path:str,columns:list=None,chunk_size:int=100_000):
+    """Yield a Parquet or CSV artifact as DataFrames of at most ``chunk_size`` rows."""
+    try:
+        if is_parquet(file_path):
+            for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size,columns=columns):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(file_path,usecols=columns,chunksize=chunk_size)
+    except Exception as e:
+        raise CustomException(e,sys)
+
+def write_table(dataframe:pd.DataFrame,file_path:str)->None:
+    try:
+        os.makedirs(os.path.dirname(file_path),exist_ok=True)
+        if is_parquet(file_path):
+            dataframe.to_parquet(file_path,index=False)
+        else:
+            dataframe.to_csv(file_path,index=False,header=True)
+    except Exception as e:
+        raise CustomException(e,sys)
+
+
+class TableWriter:
+    """Append DataFrame chunks to a Parquet (one row group per chunk) or CSV file.
+
+    The Parquet schema is fixed by the first chunk, with categorical columns
+    normalised to ``dictionary<int32, string>`` so chunks with different
+    category sets can share one file.
+    """
+    def __init__(self,file_path:str):
+        self.file_path=file_path
+        self.rows=0
+        self._writer=None
+        self._schema=None
+        self._header=True
+        os.makedirs(os.path.dirname(file_path),exist_ok=True)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    @staticmethod
+    def _normalise_schema(schema):
+        fields=[]
+        for field in schema:
+            if pa.types.is_dictionary(field.type):
+                field=field.with_type(pa.dictionary(pa.int32(),pa.string()))
+            elif pa.types.is_null(field.type) or pa.types.is_large_string(field.type):
+                field=field.with_type(pa.string())
+            fields.append(field)
+        return pa.schema(fields,metadata=schema.metadata)
+
+    def _write_arrow(self,table)->None:
+        if self._writer is None:
+            self._schema=self._normalise_schema(table.schema)
+            self._writer=pq.ParquetWriter(self.file_path,self._schema)
+        if table.num_rows:
+            self._writer.write_table(table.select(self._schema.names).cast(self._schema))
+
+    def write(self,dataframe:pd.DataFrame)->None:
+        try:
+            if is_parquet(self.file_path):
+                self._write_arrow(pa.Table.from_pandas(dataframe,preserve_index=False))
+            else:
+                dataframe.to_csv(self.file_path,mode="a",index=False,header=self._header)
+                self._header=False
+            self.rows+=len(dataframe)
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def write_file(self,file_path:str,chunk_size:int=100_000)->None:
+        """Append every row of an existing artifact without materialising it."""
+        try:
+            if is_parquet(file_path):
+                for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size):
+                    self._write_arrow(pa.Table.from_batches([batch]))
+                    self.rows+=batch.num_rows
+            else:
+                for chunk in pd.read_csv(file_path,chunksize=chunk_size):
+                    self.write(chunk)
+        except Exception as e:
+            raise CustomException(e,sys)
+
+    def close(self)->None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer=None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exc_type,exc,tb):
+        self.close()
+
+
+def save_transformed_array(file_path:str,features,target_file_path:str=None,target=None)->None:
+    """Save transformed features, either stacked with the target (legacy .npy) or
+    separately, with sparse features as a CSR ``.npz``."""
+    try:
+        os.makedirs(os.path.dirname(file_path),exist_ok=True)
+        if target_file_path is None:
+            np.save(file_path,np.c_[features,np.asarray(target)])
+            return
+        if sparse.issparse(features):
+            sparse.save_npz(file_path,features.tocsr())
+        else:
+            np.save(file_path,features)
+        np.save(target_file_path,np.asarray(target))
+    except Exception as e:
+        raise CustomException(e,sys)
+
+def load_transformed_array(file_path:str,target_file_path:str=None,mmap_mode:str=None):
+    """Return ``(X, y)`` for arrays written by ``save_transformed_array`` or the
+    streaming transformation; ``mmap_mode='r'`` maps dense ``.npy`` files instead
+    of reading them into memory."""
+    try:
+        if target_file_path is None:
+            arr=np.load(file_path,mmap_mode=mmap_mode)
+            return arr[:,:-1],arr[:,-1]
+        if file_path.endswith(".npz"):
+            features=sparse.load_npz(file_path)
+        else:
+            features=np.load(file_path,mmap_mode=mmap_mode)
+        return features,np.load(target_file_path,mmap_mode=mmap_mode)
+    except Exception as e:
+        raise CustomException(e,sys)
+
 
 # def save_numpy_array_data(file_path: str, array:np.array):
 #     try:
@@ -63,25 +243,3 @@ def write_yaml_file(file_path:str,content:object,replace:bool=False)->None:
 #             return np.load(file_obj)
 #     except Exception as e:
 #         raise CustomException(e,sys) from e
-
-# def evaluate_models(X_train,y_train,X_test,y_test,models,param):
-#     try:
-#         report={}
-#         for i in range (len(list(models))):
-#             model=list(models.values())[i]
-#             para=param[list(models.keys())[i]]
-
-#             gs=GridSearchCV(model,para,cv=3)
-#             gs.fit(X_train,y_train)
-#             model.set_params(**gs.best_params_)
-#             model.fit(X_train,y_train)
-
-#             y_train_pred=model.predict(X_train)
-#             y_test_pred=model.predict(X_test)
-#             train_model_score=r2_score(y_train,y_train_pred)
-#             test_model_score=r2_score(y_test,y_test_pred)
-#             report[list(models.keys())[i]]=test_model_score
-
-#             return report
-    except Exception as e:
-        raise CustomException(e,sys)
\ No newline at end of file
@@ -0,0 +1,191 @@
+import math
+import os
+import sys
+import time
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import numpy as np
+from sklearn.base import clone
+from sklearn.metrics import r2_score
+from sklearn.model_selection import ParameterGrid
+from threadpoolctl import threadpool_limits
+
+from src.utils.exception import CustomException
+from src.utils.log_config import logger
+from src.utils.main_utils import load_transformed_array
+
+
+def budget_params(model, resource: float, max_estimators: int) -> dict:
+    """Parameters realising ``resource`` (a 0-1 fraction) for ensembles: fewer trees on lower rungs."""
+    if "n_estimators" in model.get_params():
+        return {"n_estimators": max(10, int(round(resource * max_estimators)))}
+    return {}
+
+
+def search_split(n_rows: int, validation_fraction: float, random_state: int):
+    """Fixed ``(train_pool, validation)`` row indices shared by every trial."""
+    permutation = np.random.default_rng(random_state).permutation(n_rows)
+    n_validation = max(1, int(n_rows * validation_fraction))
+    return permutation[n_validation:], np.sort(permutation[:n_validation])
+
+
+def fit_trial(trial: dict, model, data_paths: tuple, validation_fraction: float, random_state: int) -> dict:
+    """Fit one configuration on a subsample and score it on the search validation rows.
+
+    Runs in a worker process; like candidate training it maps the transformed
+    arrays read-only instead of receiving them pickled.
+    """
+    X, y = load_transformed_array(data_paths[0], data_paths[2], mmap_mode='r')
+    train_pool, validation = search_split(X.shape[0], validation_fraction, random_state)
+    train_rows = np.sort(train_pool[:max(1, int(len(train_pool) * trial["resource"]))])
+
+    start, cpu_start = time.perf_counter(), time.process_time()
+    with threadpool_limits(limits=1):
+        model.fit(X[train_rows], y[train_rows])
+        score = r2_score(y[validation], model.predict(X[validation]))
+    return {
+        **trial,
+        "score": float(score),
+        "rows": int(len(train_rows)),
+        "seconds": time.perf_counter() - start,
+        "cpu_seconds": time.process_time() - cpu_start,
+    }
+
+
+class SuccessiveHalvingSearch:
+    """Budgeted successive-halving search over several models at once.
+
+    Every model starts with ``n_candidates`` configurations sampled from its
+    search space, trained on ``min_resource`` of the training rows (and the
+    same fraction of ``max_estimators`` trees for ensembles). After each rung
+    the best ``1/eta`` of each model's configurations move up to ``eta`` times
+    the resource, until the full training set is reached. Trials of all
+    models run together in one process pool, at most one per worker at a time.
+    A trial only starts if the CPU time spent so far, plus the estimated cost
+    of the running trials and of itself, fits in ``budget_seconds``; once one
+    does not, the remaining trials are skipped and no further rungs start. The
+    best configuration seen on the highest rung reached wins.
+    """
+
+    def __init__(
+        self,
+        search_space: dict,
+        data_paths: tuple,
+        eta: int = 3,
+        min_resource: float = 0.1,
+        n_candidates: int = 9,
+        max_estimators: int = 150,
+        budget_seconds: float = 600,
+        validation_fraction: float = 0.2,
+        max_workers: int = None,
+        random_state: int = 42,
+        on_trial=None,
+    ):
+        self.search_space = search_space
+        self.data_paths = data_paths
+        self.eta = eta
+        self.min_resource = min_resource
+        self.n_candidates = n_candidates
+        self.max_estimators = max_estimators
+        self.budget_seconds = budget_seconds
+        self.validation_fraction = validation_fraction
+        self.max_workers = max_workers
+        self.random_state = random_state
+        self.on_trial = on_trial
+        self.cpu_seconds = 0.0
+        self.budget_exhausted = False
+        # CPU seconds per unit of resource of each model's finished trials
+        self.cost_rates = {}
+
+    def rungs(self) -> list:
+        n_rungs = math.ceil(math.log(1 / self.min_resource, self.eta) - 1e-9) + 1
+        return [min(1.0, self.min_resource * self.eta ** k) for k in range(n_rungs)]
+
+    def sample_configs(self, model_name: str) -> list:
+        grid = list(ParameterGrid(self.search_space.get(model_name, {})))
+        rng = np.random.default_rng(self.random_state)
+        picks = rng.choice(len(grid), size=min(self.n_candidates, len(grid)), replace=False)
+        return [grid[i] for i in sorted(picks)]
+
+    def estimate_cpu_seconds(self, trial: dict) -> float:
+        """CPU seconds ``trial`` is expected to take, from the cost per unit of resource seen so far."""
+        rates = self.cost_rates.get(trial["model"]) or [rate for rates in self.cost_rates.values() for rate in rates]
+        return float(np.mean(rates)) * trial["resource"] if rates else 0.0
+
+    def _run_rung(self, executor, models: dict, trials: list) -> list:
+        # Keep at most one trial per worker in flight, so the budget is checked before each start
+        parallelism = self.max_workers or getattr(executor, "_max_workers", None) or os.cpu_count() or 1
+        queue = list(trials)
+        running = {}
+        results = []
+        while queue or running:
+            while queue and len(running) < parallelism:
+                committed = self.cpu_seconds + sum(self.estimate_cpu_seconds(t) for t in running.values())
+                if committed + self.estimate_cpu_seconds(queue[0]) > self.budget_seconds:
+                    logger.info(f"Search budget committed: skipping {len(queue)} trials of rung {queue[0]['rung']}")
+                    self.budget_exhausted = True
+                    queue.clear()
+                    break
+                trial = queue.pop(0)
+                model = clone(models[trial["model"]]).set_params(
+                    **trial["params"], **budget_params(models[trial["model"]], trial["resource"], self.max_estimators)
+                )
+                if "n_jobs" in model.get_params():
+                    model.set_params(n_jobs=1)
+                future = executor.submit(
+                    fit_trial, trial, model, self.data_paths, self.validation_fraction, self.random_state
+                )
+                running[future] = trial
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                del running[future]
+                result = future.result()
+                self.cpu_seconds += result["cpu_seconds"]
+                self.cost_rates.setdefault(result["model"], []).append(result["cpu_seconds"] / result["resource"])
+                results.append(result)
+                if self.on_trial is not None:
+                    self.on_trial(result)
+        if self.cpu_seconds >= self.budget_seconds:
+            self.budget_exhausted = True
+        return results
+
+    def run(self, models: dict, executor: ProcessPoolExecutor = None) -> dict:
+        """Return ``{model_name: {"params", "score", "resource"}}`` for the best configuration of each model.
+
+        Trials run on ``executor`` when given, otherwise on a pool of ``max_workers``.
+        """
+        try:
+            rungs = self.rungs()
+            survivors = {name: self.sample_configs(name) for name in models}
+            best = {name: None for name in models}
+            trial_id = 0
+            pool = nullcontext(executor) if executor is not None else ProcessPoolExecutor(max_workers=self.max_workers)
+            with pool as executor:
+                for rung, resource in enumerate(rungs):
+                    trials = []
+                    for name, configs in survivors.items():
+                        for params in configs:
+                            trials.append({"id": trial_id, "model": name, "params": params, "rung": rung, "resource": resource})
+                            trial_id += 1
+                    if not trials:
+                        break
+                    logger.info(f"Search rung {rung}: {len(trials)} trials on {resource:.0%} of the training rows")
+                    results = self._run_rung(executor, models, trials)
+
+                    for name in models:
+                        ranked = sorted((r for r in results if r["model"] == name), key=lambda r: r["score"], reverse=True)
+                        if ranked:
+                            best[name] = {"params": ranked[0]["params"], "score": ranked[0]["score"], "resource": resource}
+                        survivors[name] = [r["params"] for r in ranked[:max(1, len(ranked) // self.eta)]]
+                    if self.budget_exhausted:
+                        logger.info(f"Search CPU budget of {self.budget_seconds}s used up at rung {rung}")
+                        break
+            for name, result in best.items():
+                if result is not None:
+                    logger.info(f"Search best for {name}: {result['params']} (val r2={result['score']:.4f} at {result['resource']:.0%})")
+            return best
+        except Exception as e:
+            raise CustomException(e, sys)
@@ -0,0 +1,78 @@
+import os
+import threading
+from dotenv import load_dotenv
+from pymongo import MongoClient
+from pymongo.server_api import ServerApi
+
+load_dotenv()
+
+# MONGODB_URL is the canonical name; MONGODB_URI is still read by older scripts and CI
+MONGO_URL = os.getenv("MONGODB_URL") or os.getenv("MONGODB_URI")
+
+MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 50))
+MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 300_000))
+CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 10_000))
+SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 10_000))
+SOCKET_TIMEOUT_MS = os.getenv("MONGO_SOCKET_TIMEOUT_MS")  # unset = no socket timeout
+READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zlib")  # zstd/snappy need their optional packages
+SERVER_API_VERSION = os.getenv("MONGO_SERVER_API_VERSION")
+TLS_CA_FILE = os.getenv("MONGO_TLS_CA_FILE")
+
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+
+
+def _client_options() -> dict:
+    options = {
+        "maxPoolSize": MAX_POOL_SIZE,
+        "minPoolSize": MIN_POOL_SIZE,
+        "maxIdleTimeMS": MAX_IDLE_TIME_MS,
+        "connectTimeoutMS": CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": SERVER_SELECTION_TIMEOUT_MS,
+        "readPreference": READ_PREFERENCE,
+        "compressors": COMPRESSORS,
+        "appname": "autosense",
+    }
+    if SOCKET_TIMEOUT_MS:
+        options["socketTimeoutMS"] = int(SOCKET_TIMEOUT_MS)
+    if SERVER_API_VERSION:
+        options["server_api"] = ServerApi(SERVER_API_VERSION)
+    if TLS_CA_FILE:
+        options["tlsCAFile"] = TLS_CA_FILE
+    return options
+
+
+def get_mongo_client() -> MongoClient:
+    """Return the process-wide pooled MongoClient, creating it on first use.
+
+    The client (and its connection pool, TLS sessions and topology) is reused by
+    every pipeline stage in the process. A fresh client is created after a fork,
+    since pymongo clients must not be shared across processes.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    with _lock:
+        if _client is None or _client_pid != pid:
+            if not MONGO_URL:
+                raise ValueError("MongoDB URL not found in environment variables!")
+            _client = MongoClient(MONGO_URL, **_client_options())
+            _client_pid = pid
+    return _client
+
+
+def get_collection(database_name: str, collection_name: str):
+    return get_mongo_client()[database_name][collection_name]
+
+
+def close_mongo_client() -> None:
+    global _client, _client_pid
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
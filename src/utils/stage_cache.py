@@ -0,0 +1,244 @@
+import ast
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import shutil
+import sys
+import time
+from dataclasses import asdict, fields, is_dataclass
+
+from src.utils.exception import CustomException
+from src.utils.log_config import logger
+from src.utils.main_utils import read_yaml_file, write_yaml_file
+
+HASH_BLOCK_SIZE = 1 << 20
+# Config attributes naming run-specific locations; they change every run without
+# changing what a stage computes, so they are left out of fingerprints
+LOCATION_ATTRIBUTE_SUFFIXES = ("_path", "_dir", "_root")
+
+
+def hash_file(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _module_file(module_name: str):
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except (ImportError, AttributeError, ValueError):
+        # ``from module import name`` where name is not a submodule
+        return None
+    return spec.origin if spec is not None and spec.origin and spec.origin.endswith(".py") else None
+
+
+def _imported_modules(file_path: str, package: str) -> set:
+    with open(file_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=file_path)
+    names = set()
+    # Walk the whole tree so imports inside functions (lazy imports) count too
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            names.add(node.module)
+            names.update(f"{node.module}.{alias.name}" for alias in node.names)
+    modules = set()
+    for name in names:
+        parts = name.split(".")
+        if parts[0] == package:
+            # Importing a module runs its parent packages' __init__ too
+            modules.update(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+    return modules
+
+
+def source_files(module_name: str, package: str = "src") -> list:
+    """Files of ``module_name`` and of every ``package`` module it imports, transitively."""
+    files = set()
+    seen = set()
+    parts = module_name.split(".")
+    pending = [".".join(parts[:i]) for i in range(1, len(parts) + 1)]
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        path = _module_file(name)
+        if path is not None:
+            files.add(path)
+            pending.extend(_imported_modules(path, package))
+    return sorted(files)
+
+
+def hash_source(obj) -> str:
+    """Hash the code behind ``obj``: its class's module and every ``src`` module that pulls in.
+
+    Standing in for the component's code version, this changes with edits to
+    shared helpers and constants as well as to the component itself.
+    """
+    module_name = (obj if inspect.isclass(obj) else type(obj)).__module__
+    files = source_files(module_name, package=module_name.split(".")[0])
+    root = os.path.commonpath(files) if len(files) > 1 else os.path.dirname(files[0])
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(os.path.relpath(path, root).encode())
+        digest.update(hash_file(path).encode())
+    return digest.hexdigest()
+
+
+def config_fingerprint(config) -> dict:
+    return {
+        key: value for key, value in sorted(vars(config).items())
+        if not key.endswith(LOCATION_ATTRIBUTE_SUFFIXES)
+    }
+
+
+def artifact_paths(artifact) -> list:
+    return [
+        getattr(artifact, field.name) for field in fields(artifact)
+        if field.name.endswith("_path") and getattr(artifact, field.name)
+    ]
+
+
+def _to_plain(value):
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    if isinstance(value, dict):
+        return {key: _to_plain(item) for key, item in value.items()}
+    return value
+
+
+def _from_dict(artifact_class, content: dict):
+    kwargs = {}
+    for field in fields(artifact_class):
+        if field.name not in content:
+            continue
+        value = content[field.name]
+        if is_dataclass(field.type) and isinstance(value, dict):
+            value = _from_dict(field.type, value)
+        kwargs[field.name] = value
+    return artifact_class(**kwargs)
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+class StageCache:
+    """Content-addressed cache of pipeline stage artifacts.
+
+    Each stage has an index (``<cache_dir>/<stage>.yaml``) mapping a fingerprint
+    of the stage inputs -- upstream data hashes, config, schema and code version --
+    to the artifact a previous run produced. Entries are dropped, together with
+    their output directory, once unused for ``max_age_days`` or when the cached
+    outputs exceed ``max_size_bytes`` (least recently used first).
+    """
+
+    def __init__(self, cache_dir: str, max_age_days: float = None, max_size_bytes: int = None):
+        self.cache_dir = cache_dir
+        self.max_age_days = max_age_days
+        self.max_size_bytes = max_size_bytes
+
+    def _index_path(self, stage: str) -> str:
+        return os.path.join(self.cache_dir, f"{stage}.yaml")
+
+    def _load_index(self, stage: str) -> dict:
+        path = self._index_path(stage)
+        return (read_yaml_file(path) or {}) if os.path.exists(path) else {}
+
+    def _save_index(self, stage: str, index: dict) -> None:
+        write_yaml_file(self._index_path(stage), index, replace=True)
+
+    @staticmethod
+    def fingerprint(*parts) -> str:
+        payload = json.dumps([_to_plain(part) for part in parts], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, stage: str, fingerprint: str, artifact_class):
+        """Return the cached artifact for ``fingerprint``, or None on a miss."""
+        try:
+            index = self._load_index(stage)
+            entry = index.get(fingerprint)
+            if entry is None:
+                return None
+            artifact = _from_dict(artifact_class, entry["artifact"])
+            missing = [path for path in artifact_paths(artifact) if not os.path.exists(path)]
+            if missing:
+                logger.info(f"Cached {stage} artifact is incomplete ({missing[0]} missing), dropping it")
+                del index[fingerprint]
+                self._save_index(stage, index)
+                return None
+            entry["last_used"] = time.time()
+            self._save_index(stage, index)
+            return artifact
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def put(self, stage: str, fingerprint: str, artifact, output_dir: str) -> None:
+        try:
+            index = self._load_index(stage)
+            now = time.time()
+            index[fingerprint] = {
+                "artifact": _to_plain(asdict(artifact)),
+                "output_dir": output_dir,
+                "size_bytes": _dir_size(output_dir) if os.path.isdir(output_dir) else 0,
+                "created": now,
+                "last_used": now,
+            }
+            self._save_index(stage, index)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def evict(self, stages: list, keep: set = None) -> None:
+        """Apply the age and size limits across the given stage indexes.
+
+        ``keep`` holds ``(stage, fingerprint)`` pairs that must survive, such as
+        the artifacts the current run is returning.
+        """
+        try:
+            keep = keep or set()
+            entries = []
+            kept_size = 0
+            for stage in stages:
+                for fingerprint, entry in self._load_index(stage).items():
+                    if (stage, fingerprint) in keep:
+                        kept_size += entry["size_bytes"]
+                    else:
+                        entries.append((entry["last_used"], stage, fingerprint, entry))
+
+            expired = set()
+            now = time.time()
+            if self.max_age_days is not None:
+                for last_used, stage, fingerprint, _ in entries:
+                    if now - last_used > self.max_age_days * 86400:
+                        expired.add((stage, fingerprint))
+            if self.max_size_bytes is not None:
+                live = sorted(
+                    (entry for entry in entries if (entry[1], entry[2]) not in expired), key=lambda entry: entry[0]
+                )
+                total = kept_size + sum(entry[3]["size_bytes"] for entry in live)
+                for _, stage, fingerprint, entry in live:
+                    if total <= self.max_size_bytes:
+                        break
+                    expired.add((stage, fingerprint))
+                    total -= entry["size_bytes"]
+
+            for stage in stages:
+                index = self._load_index(stage)
+                evicted = [fingerprint for fingerprint in index if (stage, fingerprint) in expired]
+                for fingerprint in evicted:
+                    output_dir = index.pop(fingerprint)["output_dir"]
+                    shutil.rmtree(output_dir, ignore_errors=True)
+                    logger.info(f"Evicted cached {stage} output {output_dir}")
+                if evicted:
+                    self._save_index(stage, index)
+        except Exception as e:
+            raise CustomException(e, sys)
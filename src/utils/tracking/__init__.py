@@ -0,0 +1,180 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from dotenv import load_dotenv
+
+from src.utils.log_config import logger
+
+load_dotenv()
+
+# dagshub (remote MLflow on DagsHub), mlflow (local file store) or none
+TRACKING_BACKEND = os.getenv("TRACKING_BACKEND", "dagshub").lower()
+DAGSHUB_REPO_OWNER = os.getenv("DAGSHUB_REPO_OWNER", "nakul-3205")
+DAGSHUB_REPO_NAME = os.getenv("DAGSHUB_REPO_NAME", "AutoSense_Ai")
+MLFLOW_TRACKING_URI = os.getenv("MLFLOW_TRACKING_URI", "file:" + os.path.abspath("mlruns"))
+MLFLOW_EXPERIMENT_NAME = os.getenv("MLFLOW_EXPERIMENT_NAME")
+TRACKING_BATCH_SIZE = int(os.getenv("TRACKING_BATCH_SIZE", 20))
+TRACKING_SHUTDOWN_TIMEOUT = float(os.getenv("TRACKING_SHUTDOWN_TIMEOUT", 300))
+
+# MLflow rejects log_batch calls with more than 100 params
+MAX_PARAMS_PER_BATCH = 100
+
+_tracker = None
+_tracker_pid = None
+_lock = threading.Lock()
+_STOP = object()
+
+
+def _init_dagshub():
+    import dagshub
+    dagshub.init(repo_owner=DAGSHUB_REPO_OWNER, repo_name=DAGSHUB_REPO_NAME, mlflow=True, dvc=True)
+
+
+def _init_mlflow():
+    import mlflow
+    mlflow.set_tracking_uri(MLFLOW_TRACKING_URI)
+
+
+BACKENDS = {"dagshub": _init_dagshub, "mlflow": _init_mlflow}
+
+
+class NoopTracker:
+    """Drops every record; used when ``TRACKING_BACKEND=none``."""
+
+    def log_run(self, run_name: str, params: dict = None, metrics: dict = None, tags: dict = None,
+                model=None, input_example=None) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def close(self, timeout: float = None) -> None:
+        pass
+
+
+class AsyncTracker:
+    """Logs runs to MLflow from a background thread.
+
+    ``log_run`` only enqueues, so training never waits on the tracking server.
+    The backend (and mlflow itself) is imported and initialised by the worker
+    on the first record, so processes that never log pay nothing for it. Each
+    run's params, metrics and tags go out in a single ``log_batch`` call, and
+    the worker drains up to ``batch_size`` queued runs per wake-up. A single
+    worker also keeps MLflow's active-run state consistent. If the backend
+    cannot be initialised (offline, no credentials) tracking is disabled with
+    a warning instead of failing the pipeline.
+    """
+
+    def __init__(self, backend: str, batch_size: int = TRACKING_BATCH_SIZE):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown tracking backend {backend!r}; expected one of {sorted(BACKENDS)} or 'none'")
+        self.backend = backend
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._started = False
+        self._disabled = False
+        self._thread = threading.Thread(target=self._worker, name="tracking", daemon=True)
+        self._thread.start()
+
+    def log_run(self, run_name: str, params: dict = None, metrics: dict = None, tags: dict = None,
+                model=None, input_example=None) -> None:
+        """Queue one MLflow run; ``model`` is logged with a signature inferred from ``input_example``."""
+        if self._disabled:
+            return
+        self._queue.put({
+            "run_name": run_name,
+            "params": params or {},
+            "metrics": metrics or {},
+            "tags": tags or {},
+            "model": model,
+            "input_example": input_example,
+            "timestamp": int(time.time() * 1000),
+        })
+
+    def flush(self) -> None:
+        """Block until every queued run has been logged."""
+        self._queue.join()
+
+    def close(self, timeout: float = TRACKING_SHUTDOWN_TIMEOUT) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning(f"Tracking queue not drained after {timeout}s; {self._queue.qsize()} runs dropped")
+
+    def _start_backend(self) -> None:
+        try:
+            BACKENDS[self.backend]()
+            import mlflow
+            if MLFLOW_EXPERIMENT_NAME:
+                mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
+            self._started = True
+            logger.info(f"Experiment tracking initialised ({self.backend})")
+        except Exception as e:
+            logger.warning(f"Experiment tracking disabled, {self.backend} backend failed to initialise: {e}")
+            self._disabled = True
+
+    def _log(self, record: dict) -> None:
+        import mlflow.sklearn
+        from mlflow.entities import Metric, Param, RunTag
+        from mlflow.models.signature import infer_signature
+        from mlflow.tracking import MlflowClient
+
+        client = MlflowClient()
+        with mlflow.start_run(run_name=record["run_name"]) as run:
+            params = [Param(key, str(value)) for key, value in record["params"].items()]
+            metrics = [Metric(key, float(value), record["timestamp"], 0) for key, value in record["metrics"].items()]
+            tags = [RunTag(key, str(value)) for key, value in record["tags"].items()]
+            client.log_batch(run.info.run_id, metrics=metrics, params=params[:MAX_PARAMS_PER_BATCH], tags=tags)
+            for start in range(MAX_PARAMS_PER_BATCH, len(params), MAX_PARAMS_PER_BATCH):
+                client.log_batch(run.info.run_id, params=params[start:start + MAX_PARAMS_PER_BATCH])
+
+            if record["model"] is not None:
+                model, input_example = record["model"], record["input_example"]
+                signature = infer_signature(input_example, model.predict(input_example))
+                mlflow.sklearn.log_model(model, "model", signature=signature, input_example=input_example[:1])
+
+    def _worker(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for record in batch:
+                try:
+                    if record is _STOP:
+                        continue
+                    if not (self._started or self._disabled):
+                        self._start_backend()
+                    if not self._disabled:
+                        self._log(record)
+                except Exception as e:
+                    # Tracking problems must not fail an otherwise successful training run
+                    logger.warning(f"MLflow logging failed for {record['run_name']}: {e}")
+                finally:
+                    self._queue.task_done()
+            if any(record is _STOP for record in batch):
+                return
+
+
+def get_tracker():
+    """Return the process-wide tracker for ``TRACKING_BACKEND``, creating it on first use.
+
+    Queued runs are drained when the interpreter exits. A fresh tracker is
+    created after a fork, since the worker thread does not survive it.
+    """
+    global _tracker, _tracker_pid
+    pid = os.getpid()
+    if _tracker is not None and _tracker_pid == pid:
+        return _tracker
+    with _lock:
+        if _tracker is None or _tracker_pid != pid:
+            _tracker = NoopTracker() if TRACKING_BACKEND in ("none", "off", "") else AsyncTracker(TRACKING_BACKEND)
+            _tracker_pid = pid
+            atexit.register(_tracker.close)
+    return _tracker
@@ -1,14 +1,8 @@
 
-from pymongo.mongo_client import MongoClient
-from pymongo.server_api import ServerApi
-from dotenv import load_dotenv
-import os
+from src.utils.mongo_connection import get_mongo_client
 
-load_dotenv() 
-uri = os.getenv("MONGODB_URL")
-
-# Create a new client and connect to the server
-client = MongoClient(uri, server_api=ServerApi('1'))
+# Uses the shared pooled client (set MONGO_SERVER_API_VERSION=1 to pin the Stable API)
+client = get_mongo_client()
 
 # Send a ping to confirm a successful connection
 try:
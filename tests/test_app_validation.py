@@ -0,0 +1,38 @@
+import pytest
+
+from app.app import validate_cars
+
+VALID_CAR = {
+    "transmission": "Automatic",
+    "fuel_type": "Gasoline",
+    "drivetrain": "FWD",
+    "body_type": "Sedan",
+    "make": "Toyota",
+    "mileage": 42000,
+    "engine_hp": 180.0,
+    "vehicle_age": 4,
+}
+
+
+def test_valid_car_passes():
+    assert validate_cars([VALID_CAR]) == []
+
+
+@pytest.mark.parametrize("value", [10**400, -10**400, float("nan"), float("inf"), True, "42000", [1]])
+def test_non_finite_or_non_numeric_mileage_is_rejected(value):
+    assert validate_cars([{**VALID_CAR, "mileage": value}]) == ["cars[0]: mileage must be a finite number"]
+
+
+@pytest.mark.parametrize("value", [1, 1.5, ["Toyota"], {"name": "Toyota"}])
+def test_non_string_categorical_is_rejected(value):
+    assert validate_cars([{**VALID_CAR, "make": value}]) == ["cars[0]: make must be a string"]
+
+
+def test_missing_and_unknown_fields_are_reported():
+    car = {key: value for key, value in VALID_CAR.items() if key != "engine_hp"}
+    errors = validate_cars([{**car, "colour": "red"}, "not a car"])
+    assert errors == [
+        "cars[0]: missing engine_hp",
+        "cars[0]: unknown field(s) colour",
+        "cars[1]: expected an object",
+    ]
@@ -0,0 +1,98 @@
+import mongomock
+import pandas as pd
+import pytest
+from pymongo.errors import AutoReconnect
+
+import src.components.data_upload as data_upload
+from src.components.data_upload import RawUploadPipeline
+from src.entity.config_entity import DataUploadConfig
+
+
+@pytest.fixture
+def raw_csv(tmp_path):
+    df = pd.DataFrame({
+        "Unnamed: 0": range(10),
+        "make": ["Ford", "Acura", "na", "BMW", "Ford", "Kia", "Audi", "Ford", "BMW", "Kia"],
+        "mileage": ["1000", "2000", "3000", "4000", "5000", "na", "7000", "8000", "9000", "10000"],
+        "price": [float(i) for i in range(10)],
+    })
+    path = tmp_path / "raw.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(data_upload.time, "sleep", lambda seconds: None)
+
+
+def make_config(raw_csv, upsert=False, chunk_size=3):
+    config = DataUploadConfig()
+    config.raw_data_path = raw_csv
+    config.chunk_size = chunk_size
+    config.max_workers = 2
+    config.max_in_flight = 2
+    config.max_retries = 2
+    config.upsert = upsert
+    return config
+
+
+class FlakyCollection:
+    """Delegates to a mongomock collection, dropping the connection on the first ``failures`` writes."""
+
+    def __init__(self, collection, failures):
+        self.collection = collection
+        self.failures = failures
+        self.calls = 0
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    def _flaky(self, method, *args, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise AutoReconnect("connection reset")
+        return getattr(self.collection, method)(*args, **kwargs)
+
+    def insert_many(self, *args, **kwargs):
+        return self._flaky("insert_many", *args, **kwargs)
+
+    def bulk_write(self, *args, **kwargs):
+        return self._flaky("bulk_write", *args, **kwargs)
+
+
+def test_chunked_insert(raw_csv):
+    collection = mongomock.MongoClient().db.raw
+    # "na" past the first chunk in a numeric column must not fail the upload
+    assert RawUploadPipeline(make_config(raw_csv, chunk_size=3), collection=collection).run() == 10
+
+    docs = list(collection.find({}, {"_id": 0}))
+    assert len(docs) == 10
+    assert all("Unnamed: 0" not in doc for doc in docs)
+    mileage = sorted(doc["mileage"] for doc in docs if doc["mileage"] == doc["mileage"])
+    assert mileage == [1000.0, 2000.0, 3000.0, 4000.0, 5000.0, 7000.0, 8000.0, 9000.0, 10000.0]
+    assert sum(doc["make"] != doc["make"] for doc in docs) == 1  # "na" stored as missing
+
+
+def test_retry_after_connection_error(raw_csv):
+    collection = FlakyCollection(mongomock.MongoClient().db.raw, failures=2)
+    assert RawUploadPipeline(make_config(raw_csv, chunk_size=5), collection=collection).run() == 10
+    assert collection.count_documents({}) == 10
+    assert collection.calls == 4
+
+
+def test_gives_up_after_max_retries(raw_csv):
+    collection = FlakyCollection(mongomock.MongoClient().db.raw, failures=100)
+    with pytest.raises(Exception):
+        RawUploadPipeline(make_config(raw_csv), collection=collection).run()
+
+
+def test_upsert_is_idempotent(raw_csv):
+    collection = mongomock.MongoClient().db.raw
+    config = make_config(raw_csv, upsert=True)
+    RawUploadPipeline(config, collection=collection).run()
+    RawUploadPipeline(config, collection=collection).run()
+
+    docs = list(collection.find({}, {"_id": 0}))
+    assert len(docs) == 10
+    assert len({doc[config.row_hash_field] for doc in docs}) == 10
@@ -0,0 +1,135 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.sparse import issparse
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, MinMaxScaler, OneHotEncoder, StandardScaler
+
+from src.components.data_transformation import DataTransformation
+from src.serving.fast_preprocessor import FastPreprocessor, compile_preprocessor, sample_records
+from src.utils.exception import CustomException
+
+CATEGORICAL_COLUMNS = ["transmission", "fuel_type", "drivetrain", "body_type", "make"]
+NUMERIC_COLUMNS = ["mileage", "engine_hp", "vehicle_age"]
+COMMITTED_PREPROCESSOR = os.path.join(
+    os.path.dirname(__file__), "..", "best_model", "transformed_object", "preprocessing.pkl"
+)
+
+
+class TransformationConfig:
+    def __init__(self, feature_dtype: str, sparse_output: bool):
+        self.feature_dtype = feature_dtype
+        self.sparse_output = sparse_output
+
+
+@pytest.fixture(scope="module")
+def training_frame():
+    rng = np.random.default_rng(0)
+    n = 500
+    return pd.DataFrame({
+        "transmission": rng.choice(["Automatic", "Manual"], n),
+        "fuel_type": rng.choice(["Gasoline", "Diesel", "Hybrid", "Electric"], n),
+        "drivetrain": rng.choice(["FWD", "RWD", "AWD", "4WD"], n),
+        "body_type": rng.choice(["Sedan", "SUV", "Coupe", "Pickup Truck"], n),
+        "make": rng.choice(["Ford", "Acura", "BMW", "Kia", "Toyota"], n),
+        "mileage": rng.uniform(0, 250_000, n).round(),
+        "engine_hp": rng.uniform(70, 600, n).round(),
+        "vehicle_age": rng.integers(0, 30, n).astype(float),
+    })
+
+
+def plain_layout(training_frame):
+    """OneHotEncoder + bare StandardScaler, the layout of the committed best_model/."""
+    return ColumnTransformer([
+        ("ohe", OneHotEncoder(sparse_output=False, handle_unknown="ignore"), CATEGORICAL_COLUMNS),
+        ("scaler", StandardScaler(), NUMERIC_COLUMNS),
+    ]).fit(training_frame)
+
+
+def pipeline_layout(training_frame, feature_dtype: str, sparse_output: bool):
+    """The cast -> StandardScaler pipeline built by DataTransformation."""
+    transformation = DataTransformation(data_transformation_config=TransformationConfig(feature_dtype, sparse_output))
+    preprocessor, _, _ = transformation.get_transformer_object()
+    return preprocessor.fit(training_frame)
+
+
+def edge_case_records(preprocessor) -> list:
+    records = sample_records(preprocessor, 64)
+    base = records[0]
+    return records + [
+        # Unseen categories encode as all zeros, one column at a time and all at once
+        *({**base, col: "__unseen__"} for col in CATEGORICAL_COLUMNS),
+        {**base, **{col: "__unseen__" for col in CATEGORICAL_COLUMNS}},
+        # Missing numerics propagate as NaN
+        {**base, "mileage": np.nan},
+        {**base, "engine_hp": None, "vehicle_age": np.nan},
+        {col: value for col, value in base.items() if col != "vehicle_age"},
+    ]
+
+
+def assert_parity(preprocessor, records):
+    frame = pd.DataFrame.from_records(records, columns=CATEGORICAL_COLUMNS + NUMERIC_COLUMNS)
+    frame[NUMERIC_COLUMNS] = frame[NUMERIC_COLUMNS].astype("float64")
+    expected = preprocessor.transform(frame)
+    actual = FastPreprocessor(preprocessor, expected.dtype).transform(records)
+
+    assert issparse(actual) == issparse(expected)
+    assert actual.dtype == expected.dtype
+    expected = expected.toarray() if issparse(expected) else expected
+    actual = actual.toarray() if issparse(actual) else actual
+    assert actual.shape == expected.shape
+    np.testing.assert_array_equal(actual, expected)
+
+
+@pytest.mark.parametrize("feature_dtype", ["float32", "float64"])
+@pytest.mark.parametrize("sparse_output", [False, True])
+def test_pipeline_layout_parity(training_frame, feature_dtype, sparse_output):
+    preprocessor = pipeline_layout(training_frame, feature_dtype, sparse_output)
+    assert_parity(preprocessor, edge_case_records(preprocessor))
+
+
+def test_plain_scaler_layout_parity(training_frame):
+    preprocessor = plain_layout(training_frame)
+    assert_parity(preprocessor, edge_case_records(preprocessor))
+
+
+@pytest.mark.skipif(not os.path.exists(COMMITTED_PREPROCESSOR), reason="no committed best_model/")
+@pytest.mark.filterwarnings("ignore::UserWarning")
+def test_committed_preprocessor_parity():
+    with open(COMMITTED_PREPROCESSOR, "rb") as f:
+        preprocessor = pickle.load(f)
+    assert_parity(preprocessor, edge_case_records(preprocessor))
+
+
+def test_sample_records_cover_every_category(training_frame):
+    preprocessor = plain_layout(training_frame)
+    records = sample_records(preprocessor, 10)
+    for col in CATEGORICAL_COLUMNS:
+        assert {record[col] for record in records} == set(training_frame[col])
+
+
+@pytest.mark.parametrize("sparse_output", [False, True])
+def test_compile_preprocessor(training_frame, sparse_output):
+    preprocessor = pipeline_layout(training_frame, "float32", sparse_output)
+    fast = compile_preprocessor(preprocessor)
+    assert fast.sparse_output == sparse_output
+    assert fast.n_features == len(preprocessor.get_feature_names_out())
+
+
+@pytest.mark.parametrize("numeric_transformer", [
+    MinMaxScaler(),
+    Pipeline([("impute", SimpleImputer(strategy="median")), ("scaler", StandardScaler())]),
+    Pipeline([("log", FunctionTransformer(np.log1p)), ("scaler", StandardScaler())]),
+], ids=["min_max_scaler", "imputer_then_scaler", "log_then_scaler"])
+def test_compile_rejects_unsupported_layout(training_frame, numeric_transformer):
+    preprocessor = ColumnTransformer([
+        ("ohe", OneHotEncoder(sparse_output=False, handle_unknown="ignore"), CATEGORICAL_COLUMNS),
+        ("scaler", numeric_transformer, NUMERIC_COLUMNS),
+    ]).fit(training_frame)
+    with pytest.raises(CustomException):
+        compile_preprocessor(preprocessor)
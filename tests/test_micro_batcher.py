@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+from src.serving.micro_batcher import MicroBatcher
+
+
+class GatedPredict:
+    """predict_fn that holds the first call until released, so later requests queue into one batch."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.first_call = threading.Event()
+
+    def __call__(self, rows):
+        self.calls.append(list(rows))
+        if not self.first_call.is_set():
+            self.first_call.set()
+            self.release.wait(5)
+        if any(row.get("bad") for row in rows):
+            raise ValueError("bad row")
+        return [row["x"] * 10 for row in rows]
+
+
+def test_results_fan_out_in_order():
+    predict = GatedPredict()
+    batcher = MicroBatcher(predict, max_batch_size=100, max_latency_ms=200)
+    blocker = batcher.submit([{"x": 0}])
+    assert predict.first_call.wait(5)
+
+    requests = [[{"x": i}, {"x": i + 0.5}] for i in range(1, 6)] + [[{"x": 7}]]
+    futures = [batcher.submit(rows) for rows in requests]
+    predict.release.set()
+
+    assert blocker.result(5) == [0]
+    for rows, future in zip(requests, futures):
+        assert future.result(5) == [row["x"] * 10 for row in rows]
+    # Every queued request was scored in one call after the blocking one
+    assert len(predict.calls) == 2
+    assert batcher.rows == 12
+
+
+def test_failed_batch_only_fails_the_bad_request():
+    predict = GatedPredict()
+    batcher = MicroBatcher(predict, max_batch_size=100, max_latency_ms=200)
+    blocker = batcher.submit([{"x": 0}])
+    assert predict.first_call.wait(5)
+
+    good = batcher.submit([{"x": 1}, {"x": 2}])
+    bad = batcher.submit([{"x": 3, "bad": True}])
+    other = batcher.submit([{"x": 4}])
+    predict.release.set()
+
+    assert blocker.result(5) == [0]
+    assert good.result(5) == [10, 20]
+    assert other.result(5) == [40]
+    with pytest.raises(ValueError):
+        bad.result(5)
+
+
+def test_wrong_prediction_count_fails_the_request():
+    batcher = MicroBatcher(lambda rows: [1.0], max_batch_size=10, max_latency_ms=1)
+    with pytest.raises(ValueError):
+        batcher.predict([{"x": 1}, {"x": 2}], timeout=5)